@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Phasor Release Editor Benchmarks
+Times ReleaseEditor against synthetic release histories
+
+Histories are generated from the real downloads/meta.json keys. Widget-bound
+steps run against a headless tkinter stand-in by default, or against real Tk
+with --tk (e.g. under xvfb-run). Results are written as JSON; pass
+--compare with an earlier results file to flag regressions between commits.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import release_editor
+
+
+DEFAULT_META_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads', 'meta.json')
+DEFAULT_VERSIONS = [10, 100, 1000, 10000, 50000]
+DEFAULT_FILES = [25, 100]
+# Skip combinations whose file count would not fit comfortably in memory
+DEFAULT_MAX_ENTRIES = 2_000_000
+# Widget steps are timed on a sample of versions rather than all of them
+VERSION_SAMPLE = 50
+
+
+def generate_history(versions: int, files: int, meta_keys: List[str], seed: int = 0) -> Dict[str, Any]:
+    """Synthetic index.json data shaped like the real one.
+
+    Beyond the meta.json keys, extra file keys reuse them with a numeric suffix.
+    """
+    rng = random.Random(seed)
+    keys = [meta_keys[i % len(meta_keys)] + (f"-{i // len(meta_keys)}" if i >= len(meta_keys) else '')
+            for i in range(files)]
+    types_ = release_editor.RELEASE_TYPES
+    history: Dict[str, Any] = {}
+    for n in range(versions):
+        version = f"{n // 10000}.{n // 100 % 100}.{n % 100}"
+        if n % 7 == 3:
+            version += f"-rc{n % 5}"
+        base = f"https://github.com/DanielLMcGuire/Phasor/releases/download/{version}"
+        history[version] = {
+            'title': f"Phasor {version}",
+            'commit': '%040x' % rng.getrandbits(160),
+            'type': types_[n % len(types_)],
+            'gh_release': f"https://github.com/DanielLMcGuire/Phasor/releases/tag/{version}",
+            'gh_changes': f"https://github.com/DanielLMcGuire/Phasor/compare/{version}",
+            'features': [f"Feature {i} of {version}" for i in range(rng.randint(1, 8))],
+            'files': {
+                key: {'url': f"{base}/phasor-{version}-{key}.bin", 'hash': '%064x' % rng.getrandbits(256)}
+                for key in keys
+            },
+            'src': f"{base}/phasor-{version}.tar.gz",
+            'zip': f"{base}/phasor-{version}.zip",
+        }
+    return history
+
+
+class _Var:
+    def __init__(self, master: Any = None, value: Any = None, name: Optional[str] = None):
+        self._value = value
+
+    def get(self) -> Any:
+        return self._value
+
+    def set(self, value: Any):
+        self._value = value
+
+    def trace_add(self, mode: str, callback: Callable[..., Any]) -> str:
+        return ''
+
+
+class _StringVar(_Var):
+    def __init__(self, master: Any = None, value: str = '', name: Optional[str] = None):
+        super().__init__(master, value, name)
+
+
+class _Widget:
+    """Accepts any geometry/config call; the widgets the editor reads back subclass it."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self._options: Dict[str, Any] = dict(kwargs)
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        return lambda *args, **kwargs: None
+
+    def __setitem__(self, key: str, value: Any):
+        self._options[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        return self._options.get(key)
+
+
+class _Root(_Widget):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__()
+        self.pending: List[Callable[[], None]] = []
+
+    def after(self, ms: int, callback: Callable[..., Any], *args: Any) -> str:
+        self.pending.append(lambda: callback(*args))
+        return str(len(self.pending))
+
+    def after_cancel(self, job: str):
+        pass
+
+    def report_callback_exception(self, *exc_info: Any):
+        raise exc_info[1]
+
+
+class _Listbox(_Widget):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.rows: List[str] = []
+        self.selected: List[int] = []
+
+    def _index(self, index: Any) -> int:
+        return len(self.rows) if index == 'end' else int(index)
+
+    def insert(self, index: Any, *items: str):
+        i = self._index(index)
+        self.rows[i:i] = items
+
+    def delete(self, first: Any, last: Any = None):
+        i = self._index(first)
+        j = i + 1 if last is None else self._index(last) + 1
+        del self.rows[i:j]
+
+    def get(self, first: Any, last: Any = None) -> Any:
+        if last is None:
+            return self.rows[self._index(first)]
+        return tuple(self.rows[self._index(first):self._index(last) + 1])
+
+    def size(self) -> int:
+        return len(self.rows)
+
+    def curselection(self) -> Tuple[int, ...]:
+        return tuple(self.selected)
+
+    def selection_clear(self, first: Any, last: Any = None):
+        self.selected = []
+
+    def selection_set(self, first: Any, last: Any = None):
+        self.selected = [self._index(first)]
+
+
+class _Treeview(_Widget):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.selected: Tuple[str, ...] = ()
+        self._next = 0
+
+    def insert(self, parent: str, index: Any, text: str = '', values: Tuple[Any, ...] = ()) -> str:
+        self._next += 1
+        iid = f"I{self._next:06d}"
+        self.items[iid] = {'text': text, 'values': tuple(values)}
+        return iid
+
+    def delete(self, *iids: str):
+        for iid in iids:
+            self.items.pop(iid, None)
+
+    def get_children(self, item: str = '') -> Tuple[str, ...]:
+        return tuple(self.items)
+
+    def exists(self, iid: str) -> bool:
+        return iid in self.items
+
+    def item(self, iid: str, option: Optional[str] = None, **kwargs: Any) -> Any:
+        if kwargs:
+            self.items[iid].update((k, tuple(v) if k == 'values' else v) for k, v in kwargs.items())
+            return None
+        return self.items[iid] if option is None else self.items[iid][option]
+
+    def set(self, iid: str, column: str, value: Any = None):
+        pass
+
+    def selection(self) -> Tuple[str, ...]:
+        return self.selected
+
+
+class _Text(_Widget):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.text = ''
+
+    def insert(self, index: str, text: str):
+        self.text = text + self.text if index == '1.0' else self.text + text
+
+    def delete(self, first: str, last: Any = None):
+        self.text = ''
+
+    def get(self, first: str, last: Any = None) -> str:
+        return self.text + '\n'
+
+
+def headless_tk() -> Tuple[types.ModuleType, ...]:
+    """Stand-ins for tk, ttk, messagebox, filedialog and scrolledtext."""
+    tk = types.ModuleType('tk')
+    for name in ('W', 'E', 'N', 'S', 'LEFT', 'RIGHT', 'TOP', 'BOTTOM', 'X', 'Y', 'BOTH', 'WORD', 'SUNKEN'):
+        setattr(tk, name, name.lower())
+    tk.END = 'end'
+    tk.Tk = _Root
+    tk.Toplevel = _Root
+    tk.Menu = _Widget
+    tk.Listbox = _Listbox
+    tk.StringVar = _StringVar
+    tk.BooleanVar = tk.DoubleVar = tk.IntVar = _Var
+
+    ttk = types.ModuleType('ttk')
+    for name in ('Frame', 'LabelFrame', 'Label', 'Entry', 'Combobox', 'Button', 'Scrollbar', 'Progressbar'):
+        setattr(ttk, name, _Widget)
+    ttk.Treeview = _Treeview
+
+    messagebox = types.ModuleType('messagebox')
+    messagebox.showinfo = messagebox.showwarning = messagebox.showerror = lambda *args, **kwargs: 'ok'
+    messagebox.askyesno = lambda *args, **kwargs: True
+
+    filedialog = types.ModuleType('filedialog')
+    filedialog.askopenfilename = filedialog.asksaveasfilename = filedialog.askdirectory = lambda **kwargs: ''
+    filedialog.askopenfilenames = lambda **kwargs: ()
+
+    scrolledtext = types.ModuleType('scrolledtext')
+    scrolledtext.ScrolledText = _Text
+    return tk, ttk, messagebox, filedialog, scrolledtext
+
+
+def install_ui(real_tk: bool):
+    """Point release_editor's lazily imported tkinter names at real Tk or the stand-ins."""
+    if real_tk:
+        release_editor._import_tk()
+        stub = headless_tk()
+        # Dialogs would block the run
+        release_editor.messagebox = stub[2]
+        release_editor.filedialog = stub[3]
+    else:
+        (release_editor.tk, release_editor.ttk, release_editor.messagebox,
+         release_editor.filedialog, release_editor.scrolledtext) = headless_tk()
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Tuple[float, int]:
+    """(best wall time in seconds, peak traced allocation in bytes) for fn.
+    
+    fn may return the seconds it spent in the step being measured, to leave
+    its setup out of the timing.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        elapsed = fn()
+        if not isinstance(elapsed, float):
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def bench_case(versions: int, files: int, meta_keys: List[str], repeat: int, workdir: str,
+               real_tk: bool, lazy: Optional[bool] = None) -> Dict[str, Any]:
+    path = os.path.join(workdir, f"index-{versions}x{files}.json")
+    history = generate_history(versions, files, meta_keys)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=4, ensure_ascii=False)
+    del history
+
+    root = release_editor.tk.Tk()
+    editor = release_editor.ReleaseEditor(root)
+    editor.store.meta = {key: {} for key in meta_keys}
+    timings: Dict[str, float] = {}
+    peaks: Dict[str, int] = {}
+
+    def record(step: str, fn: Callable[[], Any], count: int = 1):
+        seconds, peak = measure(fn, repeat)
+        timings[step] = seconds / count
+        peaks[step] = peak
+
+    record('load_index', lambda: editor.store.load(path, lazy))
+
+    # Memory the loaded history keeps alive, not just the parse peak
+    editor.store.data = {}
+    gc.collect()
+    tracemalloc.start()
+    editor.store.load(path, lazy)
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    record('populate_version_list', editor.populate_version_list)
+
+    all_versions = list(editor.versions)
+    step = max(1, len(all_versions) // VERSION_SAMPLE)
+    sample = all_versions[::step][:VERSION_SAMPLE]
+
+    def load_versions():
+        for version in sample:
+            editor.current_version = version
+            editor.load_version_data(version)
+
+    record('load_version_data', load_versions, len(sample))
+
+    edits = itertools.count(1)
+
+    def save_versions() -> float:
+        # Edit the title and first file row of each version so save_changes
+        # has a change to apply; only the save_changes calls are timed
+        elapsed = 0.0
+        for version in sample:
+            editor.current_version = version
+            editor.load_version_data(version)
+            edit = next(edits)
+            editor.title_var.set(f"Release {version} (edit {edit})")
+            rows = editor.files_tree.get_children()
+            if rows:
+                url = editor.files_tree.item(rows[0], 'values')[0]
+                editor.files_tree.item(rows[0], values=(url, f"{edit:064x}"))
+            start = time.perf_counter()
+            editor.save_changes()
+            elapsed += time.perf_counter() - start
+        return elapsed
+
+    record('save_changes', save_versions, len(sample))
+
+    out_path = os.path.join(workdir, 'out.json')
+
+    def save_index():
+        editor.store.write_save(release_editor.SaveJob(out_path, editor.store.snapshot(), 0))
+        editor.store.release_snapshot()
+
+    record('save_index', save_index)
+
+    editor.tasks.shutdown()
+    if real_tk:
+        root.destroy()
+    result = {
+        'versions': versions,
+        'files': files,
+        'index_bytes': os.path.getsize(path),
+        'resident_bytes': resident,
+        'seconds': timings,
+        'peak_bytes': peaks,
+    }
+    os.remove(path)
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Steps at least threshold times slower (or larger) than in baseline."""
+    previous = {(r['versions'], r['files']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results['results']:
+        old = previous.get((result['versions'], result['files']))
+        if old is None:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            for step, value in result[metric].items():
+                before = old.get(metric, {}).get(step)
+                if before and value > before * threshold:
+                    regressions.append(f"{result['versions']}x{result['files']} {step} {metric}: "
+                                       f"{before:.6g} -> {value:.6g} ({value / before:.2f}x)")
+        before, value = old.get('resident_bytes'), result['resident_bytes']
+        if before and value > before * threshold:
+            regressions.append(f"{result['versions']}x{result['files']} resident_bytes: {before} -> {value}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Phasor Release Editor on synthetic histories.")
+    parser.add_argument('--versions', type=int, nargs='+', default=DEFAULT_VERSIONS)
+    parser.add_argument('--files', type=int, nargs='+', default=DEFAULT_FILES, help="files per version")
+    parser.add_argument('--max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="skip cases with more versions x files than this")
+    parser.add_argument('--repeat', type=int, default=3, help="timing runs per step (best is kept)")
+    parser.add_argument('--meta', default=DEFAULT_META_PATH, help="meta.json providing the file keys")
+    parser.add_argument('--tk', action='store_true', help="use real Tk widgets (needs a display, e.g. xvfb-run)")
+    parser.add_argument('--eager', action='store_true', help="always decode the whole index on load")
+    parser.add_argument('-o', '--output', default='-', help="results JSON file (default: stdout)")
+    parser.add_argument('--compare', metavar='BASELINE', help="earlier results JSON to check for regressions")
+    parser.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    with open(args.meta, 'r', encoding='utf-8') as f:
+        meta_keys = list(json.load(f))
+    install_ui(args.tk)
+
+    results: Dict[str, Any] = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'ui': 'tk' if args.tk else 'headless',
+        'loading': 'eager' if args.eager else 'auto',
+        'repeat': args.repeat,
+        'results': [],
+    }
+    with tempfile.TemporaryDirectory(prefix='release-bench-') as workdir:
+        for versions in args.versions:
+            for files in args.files:
+                if versions * files > args.max_entries:
+                    print(f"skipping {versions}x{files} (over --max-entries)", file=sys.stderr)
+                    continue
+                result = bench_case(versions, files, meta_keys, args.repeat, workdir, args.tk,
+                                    False if args.eager else None)
+                results['results'].append(result)
+                print(f"{versions}x{files}: " + ", ".join(f"{step} {seconds * 1000:.2f} ms"
+                                                          for step, seconds in result['seconds'].items()),
+                      file=sys.stderr)
+
+    body = json.dumps(results, indent=4)
+    if args.output == '-':
+        sys.stdout.write(body + '\n')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(body + '\n')
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
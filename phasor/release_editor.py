@@ -2,13 +2,2341 @@
 """
 Phasor Release Editor
 A GUI Release Editor
+
+Run without arguments to open the editor, or with a subcommand
+(add-version, set-file, import-dir, hash, validate, verify, export) to edit index.json headlessly.
 """
 
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, scrolledtext
-import json
-import os
-from typing import Dict, Any, Optional
+from __future__ import annotations
+
+import argparse
+import bisect
+import gzip
+import hashlib
+import html
+import io
+import json
+import mmap
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+HASH_CACHE_NAME = '.release-hashes.sqlite'
+HASH_CACHE_MAX_ENTRIES = 4096
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads', 'index.json')
+RELEASE_TYPES = ["stable", "beta", "alpha", "rc"]
+OPTIONAL_RELEASE_FIELDS = ('vscode_release', 'vs_release', 'src', 'zip')
+SUMMARY_NAME = 'summary.json'
+STAMP_SUFFIX = '.sha256'
+# Next to <name>.min.json: the stamp of the source file it was minified from
+SOURCE_SUFFIX = '.source'
+SUMMARY_FIELDS = ('title', 'type', 'commit')
+LATEST_NAME = 'latest.json'
+# Prerendered downloads page fragments, in <index dir>/html by default
+PAGES_DIR_NAME = 'html'
+PAGES_MANIFEST_NAME = 'manifest.json'
+PAGES_LIST_NAME = 'versions'
+# Bump when the page templates change so every fragment is rendered again
+PAGES_TEMPLATE_REV = '1'
+# latest.json channel for the newest release of any type
+LATEST_CHANNEL = 'latest'
+# Indexes at least this big are read as raw bytes and decoded one version at
+# a time
+LAZY_LOAD_MIN_BYTES = 1024 * 1024
+LAZY_LOADING = True
+LAZY_CACHE_SIZE = 64
+# Unsaved edits are appended to <index>.journal; fsync at most this often
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_SYNC_INTERVAL = 0.5
+JOURNAL_MAX_UNDO = 1000
+# The editor polls index.json/meta.json for outside changes this often,
+# backing off to the maximum while nothing changes
+WATCH_INTERVAL_MS = 1000
+WATCH_MAX_INTERVAL_MS = 16000
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# tkinter is only imported once the GUI launches, see _import_tk()
+tk = ttk = messagebox = filedialog = scrolledtext = None
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+class SaveJob(NamedTuple):
+    """What begin_save() snapshotted for write_save() to write off the UI thread."""
+    path: str
+    data: Dict[str, Any]
+    revision: int
+    # Versions edited since the file stamped base_rev was loaded or saved,
+    # None when unknown; latest.json is updated from just these
+    changed: Optional[Set[str]] = None
+    base_rev: Optional[str] = None
+    keys: Optional[List[str]] = None
+
+
+def sha256_file(path: str, progress: Optional[ProgressCallback] = None,
+                chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Hash a file in chunks, memory-mapping it when the filesystem allows.
+
+    hashlib releases the GIL for large updates, so several of these can run
+    on a thread pool at close to disk bandwidth.
+    """
+    digest = hashlib.sha256()
+    total = os.path.getsize(path)
+    done = 0
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if total else None
+        except (OSError, ValueError):
+            mapped = None
+        if mapped is not None:
+            with mapped:
+                view = memoryview(mapped)
+                try:
+                    while done < total:
+                        digest.update(view[done:done + chunk_size])
+                        done = min(done + chunk_size, total)
+                        if progress:
+                            progress(path, done, total)
+                finally:
+                    view.release()
+        else:
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+                done += read
+                if progress:
+                    progress(path, done, total)
+    if progress and not total:
+        progress(path, 0, 0)
+    return digest.hexdigest()
+
+
+class HashCache:
+    """SQLite-backed map of (path, size, mtime_ns, inode) to SHA-256.
+    
+    Entries are evicted least-recently-used first once max_entries is exceeded.
+    """
+    
+    def __init__(self, db_path: str = ':memory:', max_entries: int = HASH_CACHE_MAX_ENTRIES):
+        import sqlite3
+        
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS hashes ('
+            'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, '
+            'sha256 TEXT, used INTEGER)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS hashes_used ON hashes (used)')
+        self._count, self._clock = self._db.execute('SELECT COUNT(*), COALESCE(MAX(used), 0) FROM hashes').fetchone()
+    
+    @staticmethod
+    def path_for_index(index_path: str) -> str:
+        if not index_path:
+            return ':memory:'
+        return os.path.join(os.path.dirname(os.path.abspath(index_path)), HASH_CACHE_NAME)
+    
+    @staticmethod
+    def _key(path: str) -> Tuple[str, int, int, int]:
+        st = os.stat(path)
+        return os.path.realpath(path), st.st_size, st.st_mtime_ns, st.st_ino
+    
+    def get(self, path: str) -> Optional[str]:
+        real, size, mtime_ns, inode = self._key(path)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT sha256 FROM hashes WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?',
+                (real, size, mtime_ns, inode)
+            ).fetchone()
+            if row is None:
+                return None
+            self._clock += 1
+            self._db.execute('UPDATE hashes SET used = ? WHERE path = ?', (self._clock, real))
+            self._db.commit()
+            return row[0]
+    
+    def put(self, path: str, digest: str, key: Optional[Tuple[str, int, int, int]] = None):
+        real, size, mtime_ns, inode = key or self._key(path)
+        with self._lock:
+            self._clock += 1
+            exists = self._db.execute('SELECT 1 FROM hashes WHERE path = ?', (real,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)',
+                (real, size, mtime_ns, inode, digest, self._clock)
+            )
+            if not exists:
+                self._count += 1
+            if self._count > self.max_entries:
+                excess = self._count - self.max_entries
+                self._db.execute(
+                    'DELETE FROM hashes WHERE path IN (SELECT path FROM hashes ORDER BY used LIMIT ?)', (excess,)
+                )
+                self._count -= excess
+            self._db.commit()
+    
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def cached_sha256(path: str, cache: Optional[HashCache] = None, force: bool = False,
+                  progress: Optional[ProgressCallback] = None) -> str:
+    """sha256_file() that consults and fills cache unless force is set."""
+    if cache is None:
+        return sha256_file(path, progress)
+    key = cache._key(path)
+    if not force:
+        digest = cache.get(path)
+        if digest is not None:
+            if progress:
+                progress(path, key[1], key[1])
+            return digest
+    digest = sha256_file(path, progress)
+    # Only trust the digest if the file did not change while it was read
+    if cache._key(path) == key:
+        cache.put(path, digest, key)
+    return digest
+
+
+def hash_files(paths: List[str], progress: Optional[ProgressCallback] = None,
+               max_workers: int = HASH_WORKERS, cache: Optional[HashCache] = None,
+               force: bool = False) -> Iterator[Tuple[str, Optional[str], Optional[Exception]]]:
+    """Hash many files concurrently, yielding (path, digest, error) as each finishes.
+    
+    Cache hits are yielded straight away without touching the thread pool.
+    """
+    pending = []
+    for path in paths:
+        if cache is None or force:
+            pending.append(path)
+            continue
+        try:
+            digest = cache.get(path)
+        except OSError as e:
+            yield path, None, e
+            continue
+        if digest is None:
+            pending.append(path)
+        else:
+            if progress:
+                size = os.path.getsize(path)
+                progress(path, size, size)
+            yield path, digest, None
+    if not pending:
+        return
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+        futures = {pool.submit(cached_sha256, path, cache, True, progress): path for path in pending}
+        try:
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    yield path, future.result(), None
+                except Exception as e:
+                    yield path, None, e
+        finally:
+            # Closing the generator early (e.g. on cancel) skips files not yet started
+            for future in futures:
+                future.cancel()
+
+
+def url_basename(url: str) -> str:
+    return url.split('?', 1)[0].split('#', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+
+
+_ARM = r'(?:aarch64|arm64)'
+_AVX2 = r'(?:avx2|x86[-_]64[-_]v3)'
+# "win" as its own word (win-, windows_, win64.zip), so "darwin" does not match
+_WIN = r'(?<![a-z])win(?:dows|32|64)?(?![a-z0-9])'
+
+# (regex on the lower-cased file name, meta.json key); the first match wins,
+# so the ARM and AVX2 variants must come before the baseline build.
+IMPORT_PATTERNS: List[Tuple[str, str]] = [
+    (r'vscode.*\.vsix$', 'vscode'),
+    (r'\.vsix$', 'vs'),
+    (r'\.whl$', 'python'),
+    (r'docker.*\.zip$', 'dockerzip'),
+    (r'docker.*\.(?:tar\.gz|tgz)$', 'docker'),
+]
+for _component, _words in (('repl', r'repl'), ('compiler', r'compiler|phasorc'),
+                           ('interp', r'interp'), ('vm', r'\bvm\b|runtime')):
+    IMPORT_PATTERNS += [
+        (rf'(?:{_words}).*{_ARM}.*\.appimage$|{_ARM}.*(?:{_words}).*\.appimage$', f'linuxarm-{_component}'),
+        (rf'(?:{_words}).*{_AVX2}.*\.appimage$|{_AVX2}.*(?:{_words}).*\.appimage$', f'linux+-{_component}'),
+        (rf'(?:{_words}).*\.appimage$', f'linux-{_component}'),
+    ]
+IMPORT_PATTERNS += [
+    (rf'bsd.*{_ARM}.*\.(?:tar\.gz|tgz)$', 'bsdarm'),
+    (rf'bsd.*{_AVX2}.*\.(?:tar\.gz|tgz)$', 'bsd+'),
+    (r'bsd.*\.(?:tar\.gz|tgz)$', 'bsd'),
+    (rf'{_ARM}.*\.(?:pkg|dmg)$|(?:macos|darwin).*{_ARM}', 'darwinarm'),
+    (r'\.(?:pkg|dmg)$|(?:macos|darwin).*\.(?:zip|tar\.gz|tgz)$', 'darwin'),
+    (rf'{_ARM}.*\.(?:exe|msi)$|{_WIN}.*{_ARM}.*\.zip$', 'winarm'),
+    (rf'{_AVX2}.*\.(?:exe|msi)$|{_WIN}.*{_AVX2}.*\.zip$', 'win32+'),
+    (rf'\.(?:exe|msi)$|{_WIN}.*\.zip$', 'win32'),
+]
+del _component, _words
+
+ImportPatterns = List[Tuple["re.Pattern[str]", str]]
+
+
+def compile_import_patterns(extra: Iterable[Tuple[str, str]] = ()) -> ImportPatterns:
+    """Compile IMPORT_PATTERNS, with extra (regex, key) rules taking precedence."""
+    return [(re.compile(pattern), key) for pattern, key in list(extra) + IMPORT_PATTERNS]
+
+
+def match_artifact(name: str, patterns: ImportPatterns, keys: Optional[Iterable[str]] = None) -> Optional[str]:
+    lowered = name.lower()
+    for pattern, key in patterns:
+        if (keys is None or key in keys) and pattern.search(lowered):
+            return key
+    return None
+
+
+def scan_artifacts(directory: str, patterns: ImportPatterns,
+                   keys: Optional[Iterable[str]] = None) -> Tuple[Dict[str, str], List[str]]:
+    """Walk directory once, mapping meta.json keys to artifact paths.
+    
+    Returns (key -> path, unmatched relative paths). When two files map to the
+    same key the first in sorted order wins and the other is reported unmatched.
+    """
+    keys = set(keys) if keys is not None else None
+    matches: Dict[str, str] = {}
+    unmatched: List[str] = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(root, name)
+            key = match_artifact(name, patterns, keys)
+            if key is None or key in matches:
+                unmatched.append(os.path.relpath(path, directory))
+            else:
+                matches[key] = path
+    return matches, unmatched
+
+
+def release_download_base(gh_release: str) -> str:
+    """GitHub release page URL -> its asset download base URL, or '' when not a release page."""
+    if '/releases/tag/' in gh_release:
+        return gh_release.replace('/releases/tag/', '/releases/download/', 1).rstrip('/')
+    return ''
+
+
+def artifact_url(base_url: str, relative: str) -> str:
+    """URL of the artifact at relative (a '/' path) under base_url, percent-encoded; just relative without a base."""
+    from urllib.parse import quote
+    
+    base = base_url.rstrip('/')
+    return f"{base}/{quote(relative)}" if base else relative
+
+
+def import_artifacts(directory: str, base_url: str, patterns: ImportPatterns,
+                     keys: Optional[Iterable[str]] = None, cache: Optional[HashCache] = None,
+                     force: bool = False, progress: Optional[Callable[[int, int], None]] = None
+                     ) -> Tuple[Dict[str, Dict[str, str]], List[str], List[str]]:
+    """Scan a build output directory and hash every recognised artifact concurrently.
+    
+    Returns (files map ready for index.json, unmatched paths, hashing errors).
+    """
+    keys = list(keys) if keys is not None else None
+    matches, unmatched = scan_artifacts(directory, patterns, keys)
+    sizes = {path: os.path.getsize(path) for path in matches.values()}
+    total = sum(sizes.values())
+    done: Dict[str, int] = {}
+    lock = threading.Lock()
+    
+    def file_progress(path: str, read: int, size: int):
+        with lock:
+            done[path] = read
+            current = sum(done.values())
+        if progress:
+            progress(current, total)
+    
+    digests: Dict[str, str] = {}
+    errors: List[str] = []
+    for path, digest, error in hash_files(list(matches.values()), file_progress, cache=cache, force=force):
+        if isinstance(error, Cancelled):
+            raise error
+        if error is None:
+            digests[path] = digest
+        else:
+            errors.append(f"{os.path.relpath(path, directory)}: {error}")
+    
+    # Keep meta.json order so imports diff cleanly
+    order = {key: i for i, key in enumerate(keys or ())}
+    files = {}
+    for key, path in sorted(matches.items(), key=lambda item: (order.get(item[0], len(order)), item[0])):
+        if path not in digests:
+            continue
+        relative = os.path.relpath(path, directory).replace(os.sep, '/')
+        files[key] = {'url': artifact_url(base_url, relative), 'hash': digests[path]}
+    return files, unmatched, errors
+
+
+_VERSION_PART = re.compile(r'(\d*)(.*)', re.S)
+_VERSION_CHUNK = re.compile(r'\d+|\D+')
+
+
+def _natural_key(text: str) -> Tuple[Tuple[int, Any], ...]:
+    return tuple((0, int(chunk)) if chunk.isdigit() else (1, chunk) for chunk in _VERSION_CHUNK.findall(text))
+
+
+def version_key(version: str) -> Tuple[Any, ...]:
+    """Sort key for version strings; numeric parts compare as numbers.
+    
+    A pre-release sorts below its release: 1.0.0-rc1 and 1.0.0rc1 come
+    before 1.0.0, and 1.0.0-nightly.5 before 1.0.0-rc1.
+    """
+    release, dash, pre = version.partition('-')
+    parts = []
+    for part in release.split('.'):
+        digits, suffix = _VERSION_PART.match(part).groups()
+        parts.append((int(digits) if digits else -1, 0 if suffix else 1, _natural_key(suffix)))
+    if not dash:
+        return tuple(parts), (1,)
+    return tuple(parts), (0,) + tuple((0, int(i)) if i.isdigit() else (1, _natural_key(i)) for i in pre.split('.'))
+
+
+def atomic_write(path: str, content: bytes):
+    """Replace path with content via a fsynced temp file, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def write_stamped(path: str, content: bytes) -> str:
+    """atomic_write() plus a <path>.sha256 sidecar clients can revalidate against; returns the digest."""
+    digest = hashlib.sha256(content).hexdigest()
+    atomic_write(path, content)
+    atomic_write(path + STAMP_SUFFIX, digest.encode('ascii') + b'\n')
+    return digest
+
+
+def read_stamp(path: str) -> Optional[str]:
+    """The .sha256 stamp of path, if it was written no earlier than path was last modified."""
+    try:
+        if os.stat(path + STAMP_SUFFIX).st_mtime_ns < os.stat(path).st_mtime_ns:
+            return None
+        with open(path + STAMP_SUFFIX, 'r', encoding='ascii') as f:
+            stamp = f.read().strip()
+    except (OSError, ValueError):
+        return None
+    return stamp if len(stamp) == 64 and all(c in '0123456789abcdef' for c in stamp) else None
+
+
+def read_bytes(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_json(path: str, progress: Optional[Callable[[int, int], None]] = None,
+              chunk_size: int = HASH_CHUNK_SIZE) -> Any:
+    """json.load() that reads in chunks so progress (and cancellation) can be reported."""
+    total = os.path.getsize(path)
+    body = bytearray()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            body += chunk
+            if progress:
+                progress(len(body), total)
+    return json.loads(body.decode('utf-8-sig'))
+
+
+def minified_path(path: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.min{ext}"
+
+
+def gzip_bytes(body: bytes) -> bytes:
+    """Deterministic gzip: no file name or timestamp in the header."""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buffer, compresslevel=9, mtime=0) as f:
+        f.write(body)
+    return buffer.getvalue()
+
+
+def write_compact(source_path: str, data: Any) -> Dict[str, Any]:
+    """Write <name>.min.json next to source_path plus .gz (and .br when brotli is installed).
+    
+    <name>.min.json.source records the stamp of the source file the copies
+    were built from, so the downloads page can skip them once out of date.
+    Nothing is rewritten when everything is already current. Returns the
+    byte size of each variant for reporting.
+    """
+    body = dumps_index(data, separators=(',', ':')).encode('utf-8')
+    target = minified_path(source_path)
+    source = read_stamp(source_path)
+    if source is None:
+        source = hashlib.sha256(read_bytes(source_path) or b'').hexdigest()
+        atomic_write(source_path + STAMP_SUFFIX, source.encode('ascii') + b'\n')
+    origin = (source + '\n').encode('ascii')
+    variants = [(target, body), (target + '.gz', gzip_bytes(body))]
+    if brotli is not None:
+        variants.append((target + '.br', brotli.compress(body, quality=11)))
+    expected = [path for path, _ in variants[1:]] + [target + STAMP_SUFFIX]
+    if read_bytes(target) != body or not all(os.path.exists(path) for path in expected):
+        for path, content in variants[1:]:
+            atomic_write(path, content)
+        write_stamped(target, body)
+    if read_bytes(target + SOURCE_SUFFIX) != origin:
+        atomic_write(target + SOURCE_SUFFIX, origin)
+    
+    report = {'file': os.path.basename(source_path), 'source': os.path.getsize(source_path)}
+    report['min'] = len(body)
+    for path, content in variants[1:]:
+        report[path.rsplit('.', 1)[-1]] = len(content)
+    return report
+
+
+def format_size_report(report: Dict[str, Any]) -> str:
+    source = report['source']
+    parts = [f"{report['file']}: {source:,} B"]
+    for variant in ('min', 'gz', 'br'):
+        if variant in report:
+            saved = 100 - report[variant] * 100 // source if source else 0
+            parts.append(f"{variant} {report[variant]:,} B (-{saved}%)")
+    return ', '.join(parts)
+
+
+class SortedVersions:
+    """Versions ordered newest first, positioned by bisecting precomputed sort keys.
+    
+    Rows are numbered newest first, matching the version Listbox.
+    """
+    
+    def __init__(self, versions: Iterable[str] = ()):
+        self._keys = sorted((version_key(v), v) for v in versions)
+        self._members = {v for _, v in self._keys}
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __contains__(self, version: str) -> bool:
+        return version in self._members
+    
+    def __iter__(self) -> Iterator[str]:
+        return (v for _, v in reversed(self._keys))
+    
+    def __getitem__(self, row: int) -> str:
+        return self._keys[len(self._keys) - 1 - row][1]
+    
+    def index(self, version: str) -> int:
+        pair = (version_key(version), version)
+        i = bisect.bisect_left(self._keys, pair)
+        if i == len(self._keys) or self._keys[i] != pair:
+            raise ValueError(f"{version} is not in the list")
+        return len(self._keys) - 1 - i
+    
+    def insert(self, version: str) -> int:
+        """Add version (if new) and return its row."""
+        if version in self._members:
+            return self.index(version)
+        pair = (version_key(version), version)
+        i = bisect.bisect_left(self._keys, pair)
+        self._keys.insert(i, pair)
+        self._members.add(version)
+        return len(self._keys) - 1 - i
+    
+    def remove(self, version: str) -> int:
+        """Remove version and return the row it occupied."""
+        row = self.index(version)
+        del self._keys[len(self._keys) - 1 - row]
+        self._members.discard(version)
+        return row
+
+
+def is_sha256(value: str) -> bool:
+    return len(value) == 64 and all(c in '0123456789abcdefABCDEF' for c in value)
+
+
+def _digest_bytes(value: str) -> Optional[bytes]:
+    """32 raw bytes for a canonical (lower-case) SHA-256 hex string, else None."""
+    if len(value) != 64:
+        return None
+    try:
+        digest = bytes.fromhex(value)
+    except ValueError:
+        return None
+    # fromhex() accepts upper case and whitespace, which would not round-trip
+    return digest if digest.hex() == value else None
+
+
+class ReleaseFile:
+    """One files entry of a release.
+    
+    Canonical hashes are kept as 32 raw bytes; anything else (empty, upper
+    case, not a digest) is kept verbatim so saving reproduces it exactly.
+    """
+    
+    __slots__ = ('url', '_hash', 'extra')
+    
+    def __init__(self, url: str = '', hash: str = '', extra: Optional[Dict[str, Any]] = None):
+        self.url = url
+        self._hash = _digest_bytes(hash) or hash if isinstance(hash, str) else hash
+        # Original mapping for entries that are not exactly {"url", "hash"}
+        self.extra = extra
+    
+    @property
+    def hash(self) -> str:
+        return self._hash.hex() if isinstance(self._hash, bytes) else self._hash
+    
+    @property
+    def digest(self) -> Optional[bytes]:
+        return self._hash if isinstance(self._hash, bytes) else None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ReleaseFile':
+        entry = cls.__new__(cls)
+        url = entry.url = data.get('url', '')
+        hash_val = data.get('hash', '')
+        if type(hash_val) is str:
+            entry._hash = _digest_bytes(hash_val) or hash_val
+        else:
+            entry._hash = hash_val
+        canonical = len(data) == 2 and type(url) is str and type(hash_val) is str and 'url' in data and 'hash' in data
+        entry.extra = None if canonical else dict(data)
+        return entry
+    
+    def to_dict(self) -> Dict[str, Any]:
+        if self.extra is None:
+            return {'url': self.url, 'hash': self.hash}
+        data = dict(self.extra)
+        for key, value in (('url', self.url), ('hash', self.hash)):
+            if key in data or value:
+                data[key] = value
+        return data
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ReleaseFile):
+            return NotImplemented
+        return self.url == other.url and self._hash == other._hash and self.extra == other.extra
+    
+    def __repr__(self) -> str:
+        return f"ReleaseFile({self.url!r}, {self.hash!r})"
+
+
+RELEASE_FIELDS = ('title', 'commit', 'type', 'gh_release', 'gh_changes', 'vscode_release', 'vs_release',
+                  'features', 'files', 'src', 'zip')
+_RELEASE_FIELD_SET = frozenset(RELEASE_FIELDS)
+# Key orders are shared between releases; most histories only have a handful
+_KEY_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def intern_key(key: str) -> str:
+    return sys.intern(key) if type(key) is str else key
+
+
+class Release:
+    """One version of index.json.
+    
+    Absent fields are None. The original key order and any unknown keys are
+    kept so to_dict() reproduces the loaded JSON object; a known field that
+    is None but listed in order was an explicit null and is written back as
+    one.
+    """
+    
+    __slots__ = RELEASE_FIELDS + ('order', 'extra')
+    
+    def __init__(self, **fields: Any):
+        for field in RELEASE_FIELDS:
+            setattr(self, field, fields.get(field))
+        if self.files is None:
+            self.files = {}
+        order = tuple(field for field in RELEASE_FIELDS if getattr(self, field) is not None)
+        self.order = _KEY_ORDERS.setdefault(order, order)
+        self.extra: Optional[Dict[str, Any]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Release':
+        if not isinstance(data, dict):
+            raise ValueError("release is not an object")
+        release = cls.__new__(cls)
+        for field in RELEASE_FIELDS:
+            setattr(release, field, data.get(field))
+        if isinstance(release.type, str):
+            release.type = sys.intern(release.type)
+        if isinstance(release.features, list):
+            release.features = tuple(release.features)
+        files = release.files
+        if isinstance(files, dict):
+            entry = ReleaseFile.from_dict
+            intern = sys.intern
+            release.files = {intern(k): entry(v) if type(v) is dict else v for k, v in files.items()}
+        order = tuple(data)
+        release.order = _KEY_ORDERS.setdefault(order, order)
+        extra = {k: v for k, v in data.items() if k not in _RELEASE_FIELD_SET}
+        release.extra = extra or None
+        return release
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        extra = self.extra or {}
+        for key in self.order + tuple(f for f in RELEASE_FIELDS if f not in self.order):
+            if key in _RELEASE_FIELD_SET:
+                value = getattr(self, key)
+                if value is None and key not in self.order:
+                    continue
+                if key == 'features' and isinstance(value, tuple):
+                    value = list(value)
+                elif key == 'files' and isinstance(value, dict):
+                    value = {k: f.to_dict() if isinstance(f, ReleaseFile) else f for k, f in value.items()}
+                data[key] = value
+            elif key in extra:
+                data[key] = extra[key]
+        for key, value in extra.items():
+            data.setdefault(key, value)
+        return data
+    
+    def get(self, field: str, default: Any = None) -> Any:
+        value = getattr(self, field, None) if field in _RELEASE_FIELD_SET else (self.extra or {}).get(field)
+        return default if value is None else value
+    
+    def set(self, field: str, value: Any):
+        """Set a field from its JSON form (features as a list, None to remove)."""
+        if field == 'features' and isinstance(value, list):
+            value = tuple(value)
+        elif field == 'type' and isinstance(value, str):
+            value = sys.intern(value)
+        elif value is None and field in self.order:
+            order = tuple(key for key in self.order if key != field)
+            self.order = _KEY_ORDERS.setdefault(order, order)
+        setattr(self, field, value)
+    
+    def copy(self) -> 'Release':
+        release = Release.__new__(Release)
+        for slot in Release.__slots__:
+            setattr(release, slot, getattr(self, slot))
+        release.files = dict(self.files) if isinstance(self.files, dict) else self.files
+        return release
+    
+    def changed_fields(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """The subset of fields whose value differs; '' and None count as equal."""
+        changed = {}
+        for field, value in fields.items():
+            current = getattr(self, field)
+            if current == value or (current is None and value in ('', None, ())):
+                continue
+            changed[field] = value
+        return changed
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Release):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+    
+    def __repr__(self) -> str:
+        return f"Release({self.title!r}, type={self.type!r}, files={len(self.files or {})})"
+
+
+def encode_model(obj: Any) -> Any:
+    """json.dumps default= hook, so Release objects serialize without converting the whole index first."""
+    if isinstance(obj, (Release, ReleaseFile)):
+        return obj.to_dict()
+    if isinstance(obj, tuple):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_index(data: Dict[str, Any], **kwargs: Any) -> str:
+    if isinstance(data, LazyReleases):
+        return data.dumps(kwargs.get('indent'), kwargs.get('separators'))
+    kwargs.setdefault('ensure_ascii', False)
+    return json.dumps(data, default=encode_model, **kwargs)
+
+
+def releases_from_json(raw: Dict[str, Any]) -> Dict[str, Release]:
+    """Convert decoded index.json in place, freeing each version's dicts as it goes."""
+    if not isinstance(raw, dict):
+        raise ValueError("index.json is not an object")
+    for version, data in raw.items():
+        try:
+            raw[version] = Release.from_dict(data)
+        except ValueError as e:
+            raise ValueError(f"{version}: {e}") from None
+    return raw
+
+
+# A version key as written by json.dumps(indent=4): JSON strings cannot hold a
+# raw newline, so a line with exactly four spaces then a quote is top level
+_TOP_LEVEL_KEY = re.compile(rb'\n    ("(?:[^"\\\n]|\\.)*"): ')
+
+
+def scan_index(buf: Any) -> Optional[Dict[str, Tuple[int, int]]]:
+    """Byte span of every version's value in an index.json written with indent=4.
+    
+    Returns None for any other layout (minified, other indents, CRLF, BOM),
+    which callers load eagerly instead.
+    """
+    end = len(buf)
+    while end and buf[end - 1:end] in (b' ', b'\t', b'\r', b'\n'):
+        end -= 1
+    if buf[:1] != b'{' or buf[end - 2:end] != b'\n}':
+        return None
+    spans: Dict[str, Tuple[int, int]] = {}
+    version, start = None, 0
+    for match in _TOP_LEVEL_KEY.finditer(buf, 0, end):
+        if version is None:
+            if match.start() != 1:
+                return None
+        elif buf[match.start() - 1:match.start()] == b',':
+            spans[version] = (start, match.start() - 1)
+        else:
+            return None
+        try:
+            version = json.loads(match.group(1).decode('utf-8'))
+        except ValueError:
+            return None
+        if version in spans:
+            return None
+        start = match.end()
+    if version is None:
+        return None
+    spans[version] = (start, end - 2)
+    for start, stop in spans.values():
+        if buf[start:start + 1] != b'{' or not (stop - start == 2 or buf[stop - 6:stop] == b'\n    }'):
+            return None
+    return spans
+
+
+class LazyReleases(MutableMapping):
+    """index.json versions decoded on first access from the file's raw bytes.
+    
+    Untouched versions stay byte spans into body and are written back
+    verbatim. Decoded ones sit in a small LRU cache, while assigned releases
+    (new, edited) are pinned in memory until the next save.
+    
+    body is a private copy rather than a map of the file: another writer
+    rewriting index.json in place would otherwise change (or, by truncating
+    it, fault) the spans under us.
+    """
+    
+    def __init__(self, body: bytes, spans: Dict[str, Tuple[int, int]], cache_size: int = LAZY_CACHE_SIZE):
+        self.body = body
+        # version -> (start, end) span or pinned Release, in file order
+        self.entries: Dict[str, Any] = dict(spans)
+        self.cache: OrderedDict[str, Release] = OrderedDict()
+        self.cache_size = cache_size
+        # (title, type) of decoded versions, so filtering does not decode again
+        self.labels: Dict[str, Tuple[Any, Any]] = {}
+    
+    @classmethod
+    def open(cls, path: str) -> Optional['LazyReleases']:
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+    
+    @classmethod
+    def from_bytes(cls, body: bytes) -> Optional['LazyReleases']:
+        """Index body, or None when it is not in the layout scan_index() knows."""
+        spans = scan_index(body)
+        return cls(body, spans) if spans is not None else None
+    
+    def decode(self, version: str, span: Tuple[int, int]) -> Release:
+        try:
+            release = Release.from_dict(json.loads(self.body[span[0]:span[1]].decode('utf-8')))
+        except ValueError as e:
+            raise ValueError(f"{version}: {e}") from None
+        self.labels[version] = (release.title, release.type)
+        return release
+    
+    def __getitem__(self, version: str) -> Release:
+        entry = self.entries[version]
+        if isinstance(entry, Release):
+            return entry
+        release = self.cache.get(version)
+        if release is not None:
+            self.cache.move_to_end(version)
+            return release
+        release = self.cache[version] = self.decode(version, entry)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return release
+    
+    def __setitem__(self, version: str, release: Release):
+        self.entries[version] = release
+        self.cache.pop(version, None)
+    
+    def __delitem__(self, version: str):
+        del self.entries[version]
+        self.cache.pop(version, None)
+        self.labels.pop(version, None)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def __contains__(self, version: Any) -> bool:
+        return version in self.entries
+    
+    def copy(self) -> 'LazyReleases':
+        """A view for another thread: shares the body and pinned releases, not the cache."""
+        other = LazyReleases(self.body, {}, self.cache_size)
+        other.entries = dict(self.entries)
+        other.labels = dict(self.labels)
+        return other
+    
+    def insert(self, position: int, version: str, release: Release):
+        entries = list(self.entries.items())
+        entries.insert(position, (version, release))
+        self.entries = dict(entries)
+        self.cache.pop(version, None)
+    
+    def label(self, version: str) -> Tuple[Any, Any]:
+        entry = self.entries[version]
+        if isinstance(entry, Release):
+            return entry.title, entry.type
+        if version not in self.labels:
+            self[version]
+        return self.labels[version]
+    
+    def touched(self) -> int:
+        """Number of versions currently decoded or pinned."""
+        return len(self.cache) + sum(1 for entry in self.entries.values() if isinstance(entry, Release))
+    
+    def dumps(self, indent: Optional[int] = None, separators: Optional[Tuple[str, str]] = None) -> str:
+        """json.dumps() of the whole index, copying untouched spans when the layout matches."""
+        if not self.entries:
+            return '{}'
+        item_separator, key_separator = separators or ((',', ': ') if indent is not None else (', ', ': '))
+        newline = '\n' + ' ' * indent if indent is not None else ''
+        parts = []
+        for version, entry in self.entries.items():
+            if indent == 4 and not isinstance(entry, Release):
+                body = self.body[entry[0]:entry[1]].decode('utf-8')
+            else:
+                release = entry if isinstance(entry, Release) else self.decode(version, entry)
+                body = dumps_index(release, indent=indent, separators=separators)
+                if newline:
+                    body = body.replace('\n', newline)
+            parts.append(json.dumps(version, ensure_ascii=False) + key_separator + body)
+        closing = '\n' if indent is not None else ''
+        return '{' + newline + (item_separator + newline).join(parts) + closing + '}'
+
+
+def json_value(value: Any) -> Any:
+    return list(value) if isinstance(value, tuple) else value
+
+
+def file_value(entry: Any) -> Any:
+    return entry.to_dict() if isinstance(entry, ReleaseFile) else entry
+
+
+def index_stat(path: str) -> Optional[List[int]]:
+    """Identity of an index file on disk; a journal only replays onto the file it was written against."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class EditJournal:
+    """Append-only log of edits next to index.json, for crash recovery and undo/redo.
+    
+    The first line is a header with the index file's identity and the undo
+    position. It is followed by "history" lines (actions already in the file,
+    kept for undo), at most one "apply" line (ops restoring edits the file
+    lacks) and then whatever was done since: "do" actions and "undo"/"redo"
+    markers. Lines are flushed as they are written and fsynced in batches.
+    """
+    
+    def __init__(self, path: str, base: Optional[List[int]]):
+        self.path = path
+        self.base = base
+        self.file: Optional[io.TextIOWrapper] = None
+        self.lock = threading.Lock()
+        self.timer: Optional[threading.Timer] = None
+        self.last_sync = 0.0
+        self.pending = False
+    
+    @staticmethod
+    def line(record: Dict[str, Any]) -> str:
+        return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+    
+    def header(self, position: int = 0) -> Dict[str, Any]:
+        return {'journal': 1, 'base': self.base, 'position': position}
+    
+    def read(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Header and records; a torn last line from a crash is cut off."""
+        try:
+            f = open(self.path, 'r+b')
+        except FileNotFoundError:
+            return None, []
+        with f:
+            header, records, offset = None, [], 0
+            for raw in f:
+                try:
+                    if not raw.endswith(b'\n'):
+                        raise ValueError("incomplete line")
+                    record = json.loads(raw.decode('utf-8'))
+                    if not isinstance(record, dict):
+                        raise ValueError("not an object")
+                except ValueError:
+                    f.truncate(offset)
+                    break
+                if header is None:
+                    header = record
+                else:
+                    records.append(record)
+                offset += len(raw)
+        return header, records
+    
+    def append(self, record: Dict[str, Any]):
+        with self.lock:
+            if self.file is None:
+                new = not os.path.exists(self.path)
+                self.file = open(self.path, 'a', encoding='utf-8')
+                if new:
+                    self.file.write(self.line(self.header()))
+            self.file.write(self.line(record))
+            self.file.flush()
+            self.pending = True
+            if time.monotonic() - self.last_sync >= JOURNAL_SYNC_INTERVAL:
+                self._sync()
+            elif self.timer is None:
+                self.timer = threading.Timer(JOURNAL_SYNC_INTERVAL, self.sync)
+                self.timer.daemon = True
+                self.timer.start()
+    
+    def _sync(self):
+        if self.file is not None and self.pending:
+            os.fsync(self.file.fileno())
+            self.pending = False
+        self.last_sync = time.monotonic()
+    
+    def sync(self):
+        with self.lock:
+            self.timer = None
+            self._sync()
+    
+    def _close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.file is not None:
+            self._sync()
+            self.file.close()
+            self.file = None
+    
+    def close(self):
+        with self.lock:
+            self._close()
+    
+    def rewrite(self, records: List[Dict[str, Any]], position: int):
+        """Replace the journal with a compacted one (or remove it when there is nothing to keep)."""
+        with self.lock:
+            self._close()
+            if not records:
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                return
+            body = self.line(self.header(position)) + ''.join(self.line(r) for r in records)
+            atomic_write(self.path, body.encode('utf-8'))
+            self.last_sync = time.monotonic()
+    
+    def set_aside(self) -> str:
+        """Move a journal that no longer matches its index out of the way."""
+        with self.lock:
+            self._close()
+            stale = self.path + '.stale'
+            os.replace(self.path, stale)
+            return stale
+
+
+def load_releases(path: str, progress: Optional[Callable[[int, int], None]] = None,
+                  lazy: Optional[bool] = None) -> Dict[str, Release]:
+    """Read index.json; lazily if asked to, or by default when it is big enough."""
+    if lazy is None:
+        lazy = LAZY_LOADING and os.path.getsize(path) >= LAZY_LOAD_MIN_BYTES
+    if lazy:
+        releases = LazyReleases.open(path)
+        if releases is not None:
+            return releases
+    return releases_from_json(read_json(path, progress))
+
+
+class DiskState(NamedTuple):
+    """A watched file as last read: stat, SHA-256 and, for index.json, a digest per version."""
+    stat: Optional[List[int]]
+    digest: str
+    versions: Dict[str, bytes]
+
+
+class DiskChange(NamedTuple):
+    """What check_disk() found: the file's new state and, for index.json, the
+    releases that differ from the previous state (None where one was removed)."""
+    state: DiskState
+    releases: Dict[str, Optional[Release]]
+    order: List[str]
+    meta: Optional[Dict[str, Any]] = None
+
+
+def split_index(buf: Any) -> Dict[str, Any]:
+    """JSON text of each version: views of buf when scan_index() knows the layout, else re-encoded bytes."""
+    spans = scan_index(buf)
+    if spans is not None:
+        view = memoryview(buf)
+        return {version: view[start:end] for version, (start, end) in spans.items()}
+    raw = json.loads(bytes(buf).decode('utf-8-sig'))
+    if not isinstance(raw, dict):
+        raise ValueError("index.json is not an object")
+    return {version: json.dumps(value, ensure_ascii=False, sort_keys=True).encode('utf-8')
+            for version, value in raw.items()}
+
+
+def disk_state(buf: Any, stat: Optional[List[int]] = None, index: bool = True) -> DiskState:
+    """The state check_disk() compares against, from the bytes that were loaded or saved.
+    
+    stat should be taken before buf was read; None makes the next check hash the file.
+    """
+    versions = {}
+    if index:
+        texts = split_index(buf)
+        for version, text in texts.items():
+            versions[version] = hashlib.sha256(text).digest()
+            if isinstance(text, memoryview):
+                # buf may be a bytearray or map, which cannot be resized or closed while views of it exist
+                text.release()
+    return DiskState(stat, hashlib.sha256(buf).hexdigest(), versions)
+
+
+def check_disk(path: str, base: DiskState, index: bool = True) -> Optional[DiskChange]:
+    """Re-read path if it changed since base, decoding only the versions whose text differs.
+    
+    Returns None while the stat is unchanged (or the file is missing). The
+    stat is taken before reading, so a write racing with the check is seen
+    again by the next one rather than missed.
+    """
+    stat = index_stat(path)
+    if stat is None or stat == base.stat:
+        return None
+    with open(path, 'rb') as f:
+        buf = f.read()
+    digest = hashlib.sha256(buf).hexdigest()
+    if digest == base.digest:
+        return DiskChange(base._replace(stat=stat), {}, [])
+    if not index:
+        return DiskChange(DiskState(stat, digest, {}), {}, [], json.loads(buf.decode('utf-8-sig')))
+    texts = split_index(buf)
+    versions = {}
+    releases: Dict[str, Optional[Release]] = {}
+    for version, text in texts.items():
+        versions[version] = hashlib.sha256(text).digest()
+        if base.versions.get(version) != versions[version]:
+            try:
+                releases[version] = Release.from_dict(json.loads(str(text, 'utf-8')))
+            except ValueError as e:
+                raise ValueError(f"{version}: {e}") from None
+    for version in base.versions:
+        if version not in texts:
+            releases[version] = None
+    return DiskChange(DiskState(stat, digest, versions), releases, list(texts))
+
+
+def check_version_file_name(version: str, name: str, reserved: Iterable[str] = ()):
+    if (not version or os.sep in version or (os.altsep and os.altsep in version)
+            or version.startswith('.') or name in reserved):
+        raise ValueError(f"Version {version!r} cannot be used as a file name")
+
+
+_INLINE_CODE = re.compile(r'(`+)(.+?)\1')
+_INLINE_RULES = (
+    (re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)'), r'<a href="\2">\1</a>'),
+    (re.compile(r'\*\*(.+?)\*\*|__(.+?)__'), lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>"),
+    (re.compile(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)'),
+     lambda m: f"<em>{m.group(1) or m.group(2)}</em>"),
+)
+
+
+def inline_markdown(text: str) -> str:
+    """HTML for one line of the markdown features use: `code`, **bold**, *em* and [links](url)."""
+    parts = []
+    last = 0
+    for match in _INLINE_CODE.finditer(text):
+        parts.append(_inline_text(text[last:match.start()]))
+        parts.append(f"<code>{html.escape(match.group(2).strip())}</code>")
+        last = match.end()
+    parts.append(_inline_text(text[last:]))
+    return ''.join(parts)
+
+
+def _inline_text(text: str) -> str:
+    text = html.escape(text)
+    for pattern, replacement in _INLINE_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _link(url: str, label: str) -> str:
+    return f'<a href="{html.escape(url)}">{label}</a>'
+
+
+def url_file_name(url: str) -> str:
+    return url.split('/')[-1]
+
+
+def release_page_html(version: str, release: Release, meta: Dict[str, Any]) -> str:
+    """The release view of the downloads page, as generateReleaseMarkdown() + marked would render it."""
+    esc = html.escape
+    get = release.get
+    lines = ['<p><span data-version="back" class="download-btn">&larr; Back to all</span></p>',
+             f"<h1>{esc(version)}</h1>",
+             f"<h2>{esc(str(get('title', '')))}</h2>"]
+    
+    release_type = get('type', '')
+    header = (f"Commit: <code>{esc(str(get('commit') or '<commit>'))}</code>{' | ' if release_type else ' '}"
+              f"<strong><code>{esc(str(release_type or '<type>'))}</code></strong>")
+    for field, label in (('gh_release', 'GitHub'), ('vscode_release', 'VSCode'), ('vs_release', 'Visual Studio')):
+        if get(field):
+            header += f" | {_link(str(get(field)), label)}"
+    lines.append(f"<p>{header}</p>")
+    
+    lines += ['<hr>', '<h3>Changes</h3>']
+    features = [f for f in get('features', ()) if isinstance(f, str)]
+    if features:
+        lines.append('<ul>' + ''.join(f"<li>{inline_markdown(f)}</li>" for f in features) + '</ul>')
+    if get('gh_changes'):
+        lines.append(f"<p>{_link(str(get('gh_changes')), 'Compare Releases (GitHub)')}</p>")
+    
+    lines += ['<hr>', '<p><strong>Assets:</strong></p>']
+    assets = []
+    files = release.files if isinstance(release.files, dict) else {}
+    for key, file_data in files.items():
+        if not isinstance(file_data, ReleaseFile):
+            continue
+        name = f"<code>{esc(url_file_name(file_data.url))}</code>"
+        info = meta.get(key)
+        if isinstance(info, dict):
+            item = f"{esc(str(info.get('label', key)))} {_link(file_data.url, name)} <sub>({esc(str(info.get('type', '')))})</sub>"
+        else:
+            item = f"{esc(key)} {_link(file_data.url, name)}"
+        if file_data.hash:
+            item += f" <sub>sha256:</sub> <code>{esc(file_data.hash)}</code>"
+        assets.append(f"<li>{item}</li>")
+    if assets:
+        lines.append('<ul>' + ''.join(assets) + '</ul>')
+    
+    lines.append('<p><strong>Source Code: (GitHub)</strong></p>')
+    archives = []
+    for field, fallback, kind in (('src', 'Archive.tar.gz', 'gzip archive'), ('zip', 'Archive.zip', 'zip archive')):
+        url = get(field)
+        if url:
+            name = esc(url_file_name(str(url)) or fallback)
+            archives.append(f"<li>{_link(str(url), f'<code>{name}</code>')} <sub>({kind})</sub></li>")
+    if archives:
+        lines.append('<ul>' + ''.join(archives) + '</ul>')
+    return '\n'.join(lines) + '\n'
+
+
+def version_list_html(versions: Iterable[str]) -> str:
+    """The version list of the downloads page, newest first."""
+    items = ''.join(f'<li><span data-version="{html.escape(v)}" class="download-btn">{html.escape(v)}</span></li>'
+                    for v in versions)
+    return f"<ul>{items}</ul>\n"
+
+
+def latest_path(index_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(index_path)), LATEST_NAME)
+
+
+def latest_slots(release: Release, keys: Optional[List[str]]) -> Iterator[Tuple[str, Optional[str]]]:
+    """(channel, key) pairs release is a candidate for; key None is the release itself."""
+    files = release.files if isinstance(release.files, dict) else {}
+    present = [key for key in (files if keys is None else keys)
+               if isinstance(files.get(key), ReleaseFile) and files[key].url]
+    channels = (LATEST_CHANNEL, release.type) if release.type in RELEASE_TYPES else (LATEST_CHANNEL,)
+    for channel in channels:
+        yield channel, None
+        for key in present:
+            yield channel, key
+
+
+def build_latest(releases: Dict[str, Release], keys: Optional[List[str]], rev: Optional[str] = None,
+                 changed: Optional[Set[str]] = None, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """latest.json: the newest version per channel, and per channel and file key its url and hash.
+    
+    With the previous latest.json and the versions changed since, only those
+    versions are compared against the previous winners. A winner that was
+    changed and no longer qualifies is looked up again, newest first, which
+    usually stops within a version or two.
+    """
+    winners: Dict[Tuple[str, Optional[str]], str] = {}
+    entries: Dict[Tuple[str, Optional[str]], Dict[str, str]] = {}
+    todo: Optional[Set[Tuple[str, Optional[str]]]] = None
+    if previous is not None and changed is not None:
+        for channel, data in previous['channels'].items():
+            if data['version'] is not None:
+                winners[channel, None] = data['version']
+            for key, entry in data['files'].items():
+                winners[channel, key] = entry['version']
+                entries[channel, key] = entry
+        todo = set()
+        for version in changed:
+            release = releases.get(version)
+            slots = set(latest_slots(release, keys)) if release is not None else set()
+            for slot, winner in list(winners.items()):
+                if winner == version and slot not in slots:
+                    del winners[slot]
+                    entries.pop(slot, None)
+                    todo.add(slot)
+            for slot in slots - todo:
+                winner = winners.get(slot)
+                if winner is None or winner == version or version_key(version) > version_key(winner):
+                    winners[slot] = version
+                    entries.pop(slot, None)
+    
+    if todo is None or todo:
+        remaining = len(todo) if todo is not None else -1
+        for version in sorted(releases, key=version_key, reverse=True):
+            for slot in latest_slots(releases[version], keys):
+                if slot not in winners and (todo is None or slot in todo):
+                    winners[slot] = version
+                    remaining -= 1
+            if remaining == 0:
+                break
+    
+    if keys is None:
+        keys = sorted({key for _, key in winners if key is not None})
+    channels = {}
+    for channel in (LATEST_CHANNEL,) + tuple(RELEASE_TYPES):
+        files = {}
+        for key in keys:
+            version = winners.get((channel, key))
+            if version is None:
+                continue
+            entry = entries.get((channel, key))
+            if entry is None:
+                file_data = releases[version].files[key]
+                entry = {'version': version, 'url': file_data.url, 'hash': file_data.hash}
+            files[key] = entry
+        channels[channel] = {'version': winners.get((channel, None)), 'files': files}
+    return {'index': rev, 'keys': keys, 'channels': channels}
+
+
+def write_latest(path: str, releases: Dict[str, Release], keys: Optional[List[str]], rev: str,
+                 changed: Optional[Set[str]] = None, base_rev: Optional[str] = None) -> bool:
+    """Write latest.json, incrementally when the existing one was built from the index stamped base_rev."""
+    previous = None
+    if changed is not None and base_rev:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if not (isinstance(previous, dict) and previous.get('index') == base_rev and previous.get('keys') == keys):
+            previous = None
+    try:
+        latest = build_latest(releases, keys, rev, changed, previous)
+    except (KeyError, TypeError, AttributeError):
+        # A previous latest.json that is not in the expected shape
+        latest = build_latest(releases, keys, rev)
+    body = json.dumps(latest, indent=4, ensure_ascii=False).encode('utf-8')
+    if read_bytes(path) == body and os.path.exists(path + STAMP_SUFFIX):
+        return False
+    write_stamped(path, body)
+    return True
+
+
+class ReleaseIndex:
+    """index.json and meta.json contents, shared by the GUI and the CLI."""
+    
+    def __init__(self):
+        self.data: Dict[str, Release] = {}
+        self.meta: Dict[str, Any] = {}
+        self.path = ""
+        self.meta_path = ""
+        # Versions changed or deleted since the last load/save of saved_path,
+        # mapped to the edit revision that last touched them
+        self.dirty: Dict[str, int] = {}
+        self.revision = 0
+        self.saved_path = ""
+        # Stamp of saved_path as loaded or last saved, when it can be trusted
+        self.rev: Optional[str] = None
+        # Snapshots being serialized on another thread; while any are out,
+        # releases are copied before they are edited
+        self.snapshots = 0
+        self.snapshot_lock = threading.Lock()
+        # Undo history of {"label", "ops"} actions; position is where the next one goes
+        self.history: List[Dict[str, Any]] = []
+        self.position = 0
+        self.journal: Optional[EditJournal] = None
+        # index.json/meta.json as last read or written, for check_disk()
+        self.disk: Optional[DiskState] = None
+        self.meta_disk: Optional[DiskState] = None
+        # Versions edited here that another writer also changed, mapped to
+        # the release on disk (None where it was removed there)
+        self.conflicts: Dict[str, Optional[Release]] = {}
+    
+    def load(self, path: str, lazy: Optional[bool] = None):
+        self.set_loaded(path, load_releases(path, lazy=lazy))
+    
+    def set_loaded(self, path: str, data: Dict[str, Release]):
+        self.close_journal()
+        self.data = data
+        self.path = path
+        self.saved_path = path
+        self.rev = read_stamp(path)
+        self.disk = None
+        self.dirty.clear()
+        self.conflicts.clear()
+        self.history.clear()
+        self.position = 0
+    
+    def mark_dirty(self, version: str):
+        self.revision += 1
+        self.dirty[version] = self.revision
+    
+    def load_meta(self, path: str):
+        self.set_meta(path, read_json(path))
+    
+    def set_meta(self, path: str, meta: Dict[str, Any]):
+        if not isinstance(meta, dict):
+            raise ValueError("meta.json is not an object")
+        # Interned so release files keys and meta keys are the same objects
+        self.meta = {intern_key(key): value for key, value in meta.items()}
+        self.meta_path = path
+    
+    def dumps(self) -> str:
+        return dumps_index(self.data, indent=4)
+    
+    def snapshot(self) -> Dict[str, Release]:
+        """A shallow copy that stays consistent until release_snapshot() is called."""
+        with self.snapshot_lock:
+            self.snapshots += 1
+        return self.data.copy()
+    
+    def release_snapshot(self):
+        with self.snapshot_lock:
+            self.snapshots -= 1
+    
+    def writable(self, version: str) -> Release:
+        """The release for version, copied first if a snapshot may still be reading it."""
+        release = self.data[version]
+        with self.snapshot_lock:
+            if self.snapshots:
+                release = release.copy()
+        # Assigning back also pins a lazily decoded release
+        self.data[version] = release
+        return release
+    
+    def label(self, version: str) -> Tuple[Any, Any]:
+        """(title, type) of a version, without keeping a lazily loaded release decoded."""
+        if isinstance(self.data, LazyReleases):
+            return self.data.label(version)
+        release = self.data[version]
+        return release.title, release.type
+    
+    def is_dirty(self) -> bool:
+        # A conflict kept here differs from the file even when not edited since
+        return bool(self.dirty) or bool(self.conflicts) or self.path != self.saved_path
+    
+    def save(self, path: Optional[str] = None) -> bool:
+        """Atomically write index.json and its .sha256 stamp; a no-op when nothing changed."""
+        job = self.begin_save(path)
+        if job is None:
+            return False
+        try:
+            body = self.write_save(job)
+            self.save_outputs(job.data)
+        finally:
+            self.release_snapshot()
+        self.end_save(job, body)
+        return True
+    
+    def begin_save(self, path: Optional[str] = None) -> Optional[SaveJob]:
+        """Snapshot what save() would write, or None when nothing changed.
+        
+        The copy is a snapshot(): edits made while it is serialized on
+        another thread copy the release they touch, so the caller must call
+        release_snapshot() once the write has finished or failed.
+        """
+        if path:
+            self.path = path
+        if (not self.is_dirty() and os.path.exists(self.path) and os.path.exists(self.path + STAMP_SUFFIX)
+                and os.path.exists(latest_path(self.path))):
+            return None
+        same_file = self.path == self.saved_path
+        changed = set(self.dirty) | self.conflicts.keys() if same_file else None
+        return SaveJob(self.path, self.snapshot(), self.revision, changed,
+                       self.rev if same_file else None, list(self.meta) or None)
+    
+    @staticmethod
+    def write_save(job: SaveJob) -> bytes:
+        """Write index.json, then latest.json from the versions the job says changed; returns what was written."""
+        body = dumps_index(job.data, indent=4).encode('utf-8')
+        rev = write_stamped(job.path, body)
+        write_latest(latest_path(job.path), job.data, job.keys, rev, job.changed, job.base_rev)
+        return body
+    
+    def end_save(self, job: SaveJob, body: Optional[bytes] = None):
+        """Mark what job wrote as saved; body is what write_save() returned."""
+        path, revision = job.path, job.revision
+        self.saved_path = path
+        self.rev = read_stamp(path)
+        # Versions edited while the write was in flight stay dirty
+        self.dirty = {v: r for v, r in self.dirty.items() if r > revision}
+        # The saved edits won over whatever another writer had put on disk
+        self.conflicts = {v: r for v, r in self.conflicts.items() if v in self.dirty}
+        if isinstance(self.data, LazyReleases) and body is not None:
+            # Index what was just written so saved edits no longer stay pinned;
+            # not the file, which another writer may have replaced already
+            fresh = LazyReleases.from_bytes(body)
+            if fresh is not None:
+                for version in self.dirty:
+                    if version in self.data:
+                        fresh[version] = self.data[version]
+                    else:
+                        fresh.pop(version, None)
+                self.data = fresh
+        if self.journal is not None:
+            self.compact_journal(path)
+    
+    def edit_version(self, version: str, fields: Dict[str, Any],
+                     files: Optional[List[Tuple[str, str, str]]] = None) -> bool:
+        """Apply form values to a release, touching only what actually changed.
+        
+        fields maps release fields to values ('' clears an optional field);
+        files, when given, is the full ordered list of (key, url, hash) rows.
+        Returns False when nothing differs.
+        """
+        release = self.data[version]
+        fields = {k: tuple(v) if isinstance(v, list) else v for k, v in fields.items()}
+        ops = []
+        for field, value in release.changed_fields(fields).items():
+            if value == '' and field in OPTIONAL_RELEASE_FIELDS:
+                value = None
+            ops.append({'op': 'set', 'v': version, 'field': field,
+                        'old': json_value(getattr(release, field)), 'new': json_value(value)})
+        if files is not None:
+            current = release.files if isinstance(release.files, dict) else {}
+            rows = {}
+            for key, url, hash_val in files:
+                rows[key] = (url, hash_val)
+            # Positions are recorded as they are at each op, so undo can replay them backwards
+            keys = list(current)
+            for key in list(keys):
+                if key not in rows:
+                    at = keys.index(key)
+                    keys.pop(at)
+                    ops.append({'op': 'file', 'v': version, 'key': key, 'old': file_value(current[key]),
+                                'new': None, 'at': at})
+            for key, (url, hash_val) in rows.items():
+                entry = current.get(key)
+                if key not in current:
+                    ops.append({'op': 'file', 'v': version, 'key': key, 'old': None,
+                                'new': {'url': url, 'hash': hash_val}, 'at': len(keys)})
+                    keys.append(key)
+                elif not (isinstance(entry, ReleaseFile) and entry.url == url and entry.hash == hash_val):
+                    extra = entry.extra if isinstance(entry, ReleaseFile) else None
+                    ops.append({'op': 'file', 'v': version, 'key': key, 'old': file_value(entry),
+                                'new': ReleaseFile(url, hash_val, extra).to_dict(), 'at': keys.index(key)})
+            if keys != list(rows):
+                ops.append({'op': 'order', 'v': version, 'old': keys, 'new': list(rows)})
+        return self.perform(ops, f"Edit {version}")
+    
+    def perform(self, ops: List[Dict[str, Any]], label: str, record: bool = True) -> bool:
+        """Apply one user action and push it onto the undo history (and the journal)."""
+        if not ops:
+            return False
+        self.apply_ops(ops)
+        action = {'label': label, 'ops': ops}
+        del self.history[self.position:]
+        self.history.append(action)
+        if len(self.history) > JOURNAL_MAX_UNDO:
+            del self.history[0]
+        self.position = len(self.history)
+        if record and self.journal is not None:
+            self.journal.append({'do': action})
+        return True
+    
+    def undo(self, record: bool = True) -> Optional[Tuple[str, Set[str]]]:
+        """Revert the last action; returns its label and the versions it touched."""
+        if self.position == 0:
+            return None
+        self.position -= 1
+        action = self.history[self.position]
+        touched = self.apply_ops(action['ops'], undo=True)
+        if record and self.journal is not None:
+            self.journal.append({'undo': 1})
+        return action['label'], touched
+    
+    def redo(self, record: bool = True) -> Optional[Tuple[str, Set[str]]]:
+        if self.position == len(self.history):
+            return None
+        action = self.history[self.position]
+        self.position += 1
+        touched = self.apply_ops(action['ops'])
+        if record and self.journal is not None:
+            self.journal.append({'redo': 1})
+        return action['label'], touched
+    
+    def apply_ops(self, ops: List[Dict[str, Any]], undo: bool = False) -> Set[str]:
+        """Apply journal ops, or their inverses in reverse order; returns the versions touched."""
+        touched = set()
+        for op in reversed(ops) if undo else ops:
+            version, kind = op['v'], op['op']
+            value = op['old'] if undo else op['new']
+            if kind == 'release':
+                self.put_release(version, None if value is None else Release.from_dict(value), op.get('at'))
+            else:
+                release = self.writable(version)
+                files = dict(release.files) if isinstance(release.files, dict) else {}
+                if kind == 'set':
+                    release.set(op['field'], value)
+                elif kind == 'file':
+                    key = intern_key(op['key'])
+                    entry = ReleaseFile.from_dict(value) if isinstance(value, dict) else value
+                    if value is None:
+                        files.pop(key, None)
+                    elif key in files or op.get('at') is None:
+                        files[key] = entry
+                    else:
+                        items = list(files.items())
+                        items.insert(op['at'], (key, entry))
+                        files = dict(items)
+                    release.files = files
+                elif kind == 'order':
+                    release.files = dict((key, files[key]) for key in (intern_key(k) for k in value) if key in files)
+                else:
+                    raise ValueError(f"Unknown journal op {kind!r}")
+            self.mark_dirty(version)
+            touched.add(version)
+        return touched
+    
+    def put_release(self, version: str, release: Optional[Release], position: Optional[int] = None):
+        if release is None:
+            if version in self.data:
+                del self.data[version]
+        elif version in self.data or position is None or position >= len(self.data):
+            self.data[version] = release
+        elif isinstance(self.data, LazyReleases):
+            self.data.insert(position, version, release)
+        else:
+            # Undoing a delete puts the version back where it was in the file
+            items = list(self.data.items())
+            items.insert(position, (version, release))
+            self.data.clear()
+            self.data.update(items)
+    
+    def version_position(self, version: str) -> int:
+        return list(self.data).index(version)
+    
+    def open_journal(self) -> Tuple[int, Optional[str]]:
+        """Journal edits to the loaded index, first replaying any a crash left behind.
+        
+        Returns how many versions the replay left with unsaved edits, and where
+        a journal holding edits made against a different copy of the file was
+        moved to.
+        """
+        self.close_journal()
+        journal = EditJournal(self.path + JOURNAL_SUFFIX, index_stat(self.path))
+        header, records = journal.read()
+        stale = None
+        if header is not None:
+            if header.get('journal') != 1 or header.get('base') != journal.base:
+                # Undo history alone (as left by a clean save) is of no use
+                # against another copy of the file; only unsaved edits are kept
+                if all('history' in record for record in records):
+                    journal.rewrite([], 0)
+                else:
+                    stale = journal.set_aside()
+            else:
+                try:
+                    self.replay(header, records)
+                except (KeyError, ValueError, TypeError, IndexError, AttributeError):
+                    stale = journal.set_aside()
+                    self.set_loaded(self.path, load_releases(self.path))
+        self.journal = journal
+        return len(self.dirty), stale
+    
+    def replay(self, header: Dict[str, Any], records: List[Dict[str, Any]]):
+        positioned = False
+        for record in records:
+            if 'history' in record:
+                self.history.append(record['history'])
+                continue
+            if not positioned:
+                self.position = min(int(header.get('position', 0)), len(self.history))
+                positioned = True
+            if 'apply' in record:
+                self.apply_ops(record['apply'])
+            elif 'do' in record:
+                self.perform(record['do']['ops'], record['do'].get('label', ''), record=False)
+            elif 'undo' in record:
+                self.undo(record=False)
+            elif 'redo' in record:
+                self.redo(record=False)
+        if not positioned:
+            self.position = min(int(header.get('position', 0)), len(self.history))
+    
+    def compact_journal(self, path: str):
+        """After a save: keep the undo history, plus ops restoring edits the file does not have yet."""
+        journal = self.journal
+        if journal.path != path + JOURNAL_SUFFIX:
+            journal.rewrite([], 0)
+            journal = self.journal = EditJournal(path + JOURNAL_SUFFIX, None)
+        journal.base = index_stat(path)
+        records: List[Dict[str, Any]] = [{'history': action} for action in self.history]
+        restore = []
+        for version in self.dirty:
+            release = self.data.get(version)
+            restore.append({'op': 'release', 'v': version, 'old': None,
+                            'new': None if release is None else release.to_dict(),
+                            'at': None if release is None else self.version_position(version)})
+        if restore:
+            records.append({'apply': restore})
+        journal.rewrite(records, self.position)
+    
+    def merge_disk(self, change: DiskChange, keep: Iterable[str] = ()) -> Tuple[Set[str], Set[str]]:
+        """Take the versions another writer changed in index.json.
+        
+        Versions with unsaved edits here, or listed in keep, are left as they
+        are and flagged in conflicts with the release on disk. Returns the
+        versions merged and the versions in conflict.
+        """
+        merged: Set[str] = set()
+        conflicted: Set[str] = set()
+        keep = set(keep)
+        for version, release in change.releases.items():
+            local = self.data.get(version)
+            if local == release:
+                self.conflicts.pop(version, None)
+                continue
+            if version in self.dirty or version in self.conflicts or version in keep:
+                self.conflicts[version] = release
+                conflicted.add(version)
+                continue
+            position = None
+            if local is None and release is not None:
+                # After the nearest version that precedes it in the file
+                at = change.order.index(version)
+                previous = next((v for v in reversed(change.order[:at]) if v in self.data), None)
+                position = 0 if previous is None else self.version_position(previous) + 1
+            self.put_release(version, release, position)
+            with self.snapshot_lock:
+                if self.snapshots:
+                    # A save in flight is writing the old release, so the next one must write this
+                    self.mark_dirty(version)
+            merged.add(version)
+        self.disk = change.state
+        if self.path == self.saved_path:
+            self.rev = read_stamp(self.path)
+        if self.journal is not None and change.releases:
+            # Replaying onto the file as it is now
+            self.compact_journal(self.path)
+        return merged, conflicted
+    
+    def merge_meta(self, change: DiskChange):
+        if change.meta is not None:
+            self.set_meta(self.meta_path, change.meta)
+        self.meta_disk = change.state
+    
+    def take_disk_version(self, version: str) -> bool:
+        """Resolve a conflict by replacing the local edits with the release on disk, as an undoable action."""
+        release = self.conflicts.pop(version)
+        local = self.data.get(version)
+        return self.perform([{'op': 'release', 'v': version,
+                              'old': None if local is None else local.to_dict(),
+                              'new': None if release is None else release.to_dict(),
+                              'at': None if local is None else self.version_position(version)}],
+                            f"Use {version} from disk")
+    
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+    
+    def save_compact(self, data: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Write minified and precompressed siblings of index.json and meta.json."""
+        reports = [write_compact(self.path, self.data if data is None else data)]
+        if self.meta_path:
+            reports.append(write_compact(self.meta_path, self.meta))
+        return reports
+    
+    def shard_dir(self) -> str:
+        return os.path.dirname(os.path.abspath(self.path))
+    
+    def save_shards(self, directory: Optional[str] = None,
+                    data: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[str]]:
+        """Write summary.json plus one <version>.json per release.
+        
+        Only releases whose serialized content changed since the last run are
+        rewritten, and shards of deleted releases are removed. summary.json
+        records the index.json stamp it was built from, so the downloads page
+        can tell when it is out of date. Returns the lists of written and
+        removed file names.
+        """
+        directory = directory or self.shard_dir()
+        releases = self.data if data is None else data
+        index_rev = read_stamp(self.path) if self.path else None
+        summary_path = os.path.join(directory, SUMMARY_NAME)
+        previous = {}
+        try:
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                previous = {entry['version']: entry.get('rev') for entry in json.load(f).get('versions', [])}
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            pass
+        
+        written, removed = [], []
+        entries = []
+        for version in sorted(releases, key=version_key, reverse=True):
+            check_version_file_name(version, f"{version}.json", (SUMMARY_NAME, LATEST_NAME, 'index.json', 'meta.json'))
+            data = releases[version]
+            body = dumps_index(data, indent=4).encode('utf-8')
+            rev = hashlib.sha256(body).hexdigest()[:16]
+            name = f"{version}.json"
+            shard_path = os.path.join(directory, name)
+            if previous.get(version) != rev or not os.path.exists(shard_path):
+                atomic_write(shard_path, body)
+                written.append(name)
+            entry = {'version': version}
+            entry.update((field, data.get(field, '')) for field in SUMMARY_FIELDS)
+            entry['rev'] = rev
+            entries.append(entry)
+        
+        for version in previous.keys() - releases.keys():
+            name = f"{version}.json"
+            try:
+                os.remove(os.path.join(directory, name))
+                removed.append(name)
+            except OSError:
+                pass
+        
+        summary = json.dumps({'index': index_rev, 'versions': entries}, indent=4, ensure_ascii=False).encode('utf-8')
+        if read_bytes(summary_path) != summary or not os.path.exists(summary_path + STAMP_SUFFIX):
+            write_stamped(summary_path, summary)
+            written.append(SUMMARY_NAME)
+        return written, removed
+    
+    def save_outputs(self, data: Optional[Dict[str, Any]] = None, meta: Optional[Dict[str, Any]] = None,
+                     shards: bool = False, pages: bool = False, compact: bool = False) -> Tuple[Any, Any, List[Any]]:
+        """Write the derived files asked for, plus the ones that already exist so a save never leaves them stale.
+        
+        Returns the save_shards() and save_pages() results (None when not
+        written) and the save_compact() reports.
+        """
+        shard_dir = self.shard_dir()
+        if shards or os.path.exists(os.path.join(shard_dir, SUMMARY_NAME)):
+            shards = self.save_shards(shard_dir, data)
+        else:
+            shards = None
+        pages_dir = self.pages_dir()
+        if pages or os.path.exists(os.path.join(pages_dir, PAGES_MANIFEST_NAME)):
+            pages = self.save_pages(pages_dir, data, meta)
+        else:
+            pages = None
+        if compact or os.path.exists(minified_path(self.path)):
+            reports = self.save_compact(data)
+        else:
+            reports = []
+        return shards, pages, reports
+    
+    def pages_dir(self) -> str:
+        return os.path.join(self.shard_dir(), PAGES_DIR_NAME)
+    
+    def save_pages(self, directory: Optional[str] = None, data: Optional[Dict[str, Any]] = None,
+                   meta: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[str]]:
+        """Prerender <version>.html for every release plus versions.html for the list.
+        
+        manifest.json maps each fragment to a hash of what it was rendered
+        from (the release and the meta.json entries it uses), so only changed
+        releases are rendered again, and records the index.json stamp so the
+        downloads page can tell when the pages are out of date. Returns the
+        written and removed names.
+        """
+        directory = directory or self.pages_dir()
+        releases = self.data if data is None else data
+        meta = self.meta if meta is None else meta
+        index_rev = read_stamp(self.path) if self.path else None
+        os.makedirs(directory, exist_ok=True)
+        manifest_path = os.path.join(directory, PAGES_MANIFEST_NAME)
+        previous: Dict[str, Any] = {}
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            if not isinstance(previous.get('versions'), dict):
+                previous = {}
+        except (OSError, ValueError, AttributeError):
+            previous = {}
+        old_revs = previous.get('versions', {})
+        
+        written, removed = [], []
+        revs = {}
+        versions = sorted(releases, key=version_key, reverse=True)
+        for version in versions:
+            name = f"{version}.html"
+            check_version_file_name(version, name, (f"{PAGES_LIST_NAME}.html",))
+            release = releases[version]
+            files = release.files if isinstance(release.files, dict) else {}
+            source = dumps_index([release, [meta.get(key) for key in files]], separators=(',', ':'))
+            rev = hashlib.sha256(f"{PAGES_TEMPLATE_REV}\n{version}\n{source}".encode('utf-8')).hexdigest()[:16]
+            revs[version] = rev
+            page_path = os.path.join(directory, name)
+            if old_revs.get(version) != rev or not os.path.exists(page_path):
+                atomic_write(page_path, release_page_html(version, release, meta).encode('utf-8'))
+                written.append(name)
+        
+        for version in old_revs.keys() - revs.keys():
+            name = f"{version}.html"
+            try:
+                os.remove(os.path.join(directory, name))
+                removed.append(name)
+            except OSError:
+                pass
+        
+        list_name = f"{PAGES_LIST_NAME}.html"
+        list_body = version_list_html(versions).encode('utf-8')
+        list_rev = hashlib.sha256(list_body).hexdigest()[:16]
+        if previous.get('list') != list_rev or not os.path.exists(os.path.join(directory, list_name)):
+            atomic_write(os.path.join(directory, list_name), list_body)
+            written.append(list_name)
+        
+        manifest = json.dumps({'index': index_rev, 'list': list_rev, 'versions': revs},
+                              indent=4, ensure_ascii=False).encode('utf-8')
+        if read_bytes(manifest_path) != manifest or not os.path.exists(manifest_path + STAMP_SUFFIX):
+            write_stamped(manifest_path, manifest)
+            written.append(PAGES_MANIFEST_NAME)
+        return written, removed
+    
+    def new_version(self, version: str, **fields: Any) -> Release:
+        if not version:
+            raise ValueError("Version number cannot be empty")
+        if version in self.data:
+            raise ValueError(f"Version {version} already exists")
+        
+        data = {
+            'title': version,
+            'commit': '',
+            'type': 'beta',
+            'gh_release': '',
+            'gh_changes': '',
+            'features': [],
+            'files': {}
+        }
+        data.update({k: json_value(v) for k, v in fields.items() if v is not None})
+        self.perform([{'op': 'release', 'v': version, 'old': None, 'new': data, 'at': len(self.data)}],
+                     f"Add {version}")
+        return self.data[version]
+    
+    def delete_version(self, version: str):
+        self.perform([{'op': 'release', 'v': version, 'old': self.data[version].to_dict(), 'new': None,
+                       'at': self.version_position(version)}], f"Delete {version}")
+    
+    def set_file(self, version: str, key: str, url: Optional[str] = None, hash_val: Optional[str] = None):
+        if version not in self.data:
+            raise KeyError(f"Version {version} does not exist")
+        files = self.data[version].files if isinstance(self.data[version].files, dict) else {}
+        entry = files.get(key)
+        current = entry if isinstance(entry, ReleaseFile) else ReleaseFile()
+        new = ReleaseFile(current.url if url is None else url,
+                          current.hash if hash_val is None else hash_val, current.extra).to_dict()
+        old = file_value(entry) if key in files else None
+        if old != new:
+            at = list(files).index(key) if key in files else len(files)
+            self.perform([{'op': 'file', 'v': version, 'key': key, 'old': old, 'new': new, 'at': at}],
+                         f"Set {version}/{key}")
+    
+    def validate(self) -> List[str]:
+        problems = []
+        for version, data in self.data.items():
+            if not data.title:
+                problems.append(f"{version}: missing title")
+            if data.type not in RELEASE_TYPES:
+                problems.append(f"{version}: unknown type {data.type!r}")
+            if not isinstance(data.features, (tuple, type(None))):
+                problems.append(f"{version}: features is not a list")
+            if not isinstance(data.files, dict):
+                problems.append(f"{version}: files is not an object")
+                continue
+            for key, file_data in data.files.items():
+                if not isinstance(file_data, ReleaseFile):
+                    problems.append(f"{version}/{key}: file entry is not an object")
+                    continue
+                if self.meta and key not in self.meta:
+                    problems.append(f"{version}/{key}: key not in meta.json")
+                if not file_data.url:
+                    problems.append(f"{version}/{key}: missing url")
+                hash_val = file_data.hash
+                if hash_val and not is_sha256(hash_val):
+                    problems.append(f"{version}/{key}: hash is not a SHA-256 hex digest")
+        return problems
+
+
+VERIFY_WORKERS = 8
+VERIFY_TIMEOUT = 30
+VERIFY_FAILURES = ('missing', 'mismatch', 'error')
+
+
+def iter_artifacts(data: Dict[str, Release]) -> Iterator[Dict[str, str]]:
+    """Every url/hash pair in the index: files entries plus the src and zip archives."""
+    for version in sorted(data, key=version_key, reverse=True):
+        release = data[version]
+        for key, file_data in release.get('files', {}).items():
+            if isinstance(file_data, ReleaseFile):
+                yield {'version': version, 'key': key, 'url': file_data.url, 'hash': file_data.hash}
+        for field in ('src', 'zip'):
+            if release.get(field):
+                yield {'version': version, 'key': field, 'url': release.get(field), 'hash': ''}
+
+
+def artifact_locations(url: str, version: str, source: str) -> List[str]:
+    """Where an artifact may live under a mirror directory or base URL.
+    
+    Tried in order: the URL's own path, <version>/<file name>, then <file name>.
+    """
+    from urllib.parse import quote, unquote, urlsplit
+    
+    parts = urlsplit(url)
+    path = (parts.path if parts.scheme else url.split('?', 1)[0]).lstrip('/')
+    name = path.rsplit('/', 1)[-1]
+    relative = list(dict.fromkeys(p for p in (path, f"{version}/{name}", name) if p))
+    if source.startswith(('http://', 'https://')):
+        return [f"{source.rstrip('/')}/{quote(unquote(p))}" for p in relative]
+    return [os.path.join(source, *unquote(p).split('/')) for p in relative]
+
+
+class HTTPConnectionPool:
+    """Keep-alive connections, one set per worker thread, keyed by scheme and host."""
+    
+    def __init__(self, timeout: float = VERIFY_TIMEOUT):
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: List[Any] = []
+    
+    def _connection(self, scheme: str, netloc: str, fresh: bool = False):
+        import http.client
+        
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get((scheme, netloc))
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            factory = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            conn = conns[(scheme, netloc)] = factory(netloc, timeout=self.timeout)
+            with self._lock:
+                self._all.append(conn)
+        return conn
+    
+    def get(self, url: str, redirects: int = 5):
+        """GET url, following redirects; the caller must read the response to the end."""
+        import http.client
+        from urllib.parse import urljoin, urlsplit
+        
+        parts = urlsplit(url)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        for fresh in (False, True):
+            conn = self._connection(parts.scheme, parts.netloc, fresh)
+            try:
+                conn.request('GET', target, headers={'Accept-Encoding': 'identity'})
+                response = conn.getresponse()
+                break
+            except (http.client.HTTPException, OSError):
+                # A kept-alive connection the server already closed; retry once on a new one
+                conn.close()
+                if fresh:
+                    raise
+        if response.status in (301, 302, 303, 307, 308) and redirects:
+            location = response.getheader('Location', '')
+            response.read()
+            return self.get(urljoin(url, location), redirects - 1)
+        return response
+    
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+
+
+def _fetch_sha256(pool: HTTPConnectionPool, url: str) -> Optional[Tuple[str, int, Optional[int]]]:
+    """(digest, bytes read, Content-Length) for url, or None on 404/410."""
+    response = pool.get(url)
+    if response.status in (404, 410):
+        response.read()
+        return None
+    if response.status != 200:
+        response.read()
+        raise OSError(f"HTTP {response.status} {response.reason}")
+    length = response.getheader('Content-Length')
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = response.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size, int(length) if length is not None else None
+
+
+def verify_artifact(entry: Dict[str, str], source: str, pool: Optional[HTTPConnectionPool] = None,
+                    cache: Optional[HashCache] = None) -> Dict[str, Any]:
+    result: Dict[str, Any] = dict(entry)
+    if not entry['url']:
+        result.update(status='missing', reason="no url in index")
+        return result
+    
+    found = None
+    try:
+        for location in artifact_locations(entry['url'], entry['version'], source):
+            if pool is not None:
+                fetched = _fetch_sha256(pool, location)
+                if fetched is None:
+                    continue
+                digest, size, expected_size = fetched
+            else:
+                if not os.path.isfile(location):
+                    continue
+                size = expected_size = os.path.getsize(location)
+                digest = cached_sha256(location, cache)
+            found = location
+            break
+    except Exception as e:
+        result.update(status='error', reason=str(e))
+        return result
+    
+    if found is None:
+        result.update(status='missing', reason="not found in source")
+        return result
+    
+    result.update(location=found, size=size, actual=digest)
+    if expected_size is not None and size != expected_size:
+        result.update(status='mismatch', reason=f"read {size} of {expected_size} bytes")
+    elif not entry['hash']:
+        result.update(status='unverified', reason="no hash in index")
+    elif digest.lower() != entry['hash'].lower():
+        result.update(status='mismatch', reason="sha256 differs")
+    else:
+        result['status'] = 'ok'
+    return result
+
+
+def verify_release_history(data: Dict[str, Any], source: str, workers: int = VERIFY_WORKERS,
+                           cache: Optional[HashCache] = None,
+                           progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """Check every artifact in the index against a mirror directory or base URL.
+    
+    Returns a JSON-serializable report with per-entry status (ok, missing,
+    mismatch, error or unverified) and a summary count of each.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    entries = list(iter_artifacts(data))
+    remote = source.startswith(('http://', 'https://'))
+    pool = HTTPConnectionPool() if remote else None
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for i, result in enumerate(executor.map(lambda e: verify_artifact(e, source, pool, cache), entries), 1):
+                results.append(result)
+                if progress:
+                    progress(i, len(entries))
+    finally:
+        if pool is not None:
+            pool.close()
+    
+    summary = dict.fromkeys(('ok',) + VERIFY_FAILURES + ('unverified',), 0)
+    for result in results:
+        summary[result['status']] += 1
+    return {'source': source, 'summary': summary, 'entries': results}
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Task:
+    """Handle for work running on a TaskRunner thread."""
+    
+    def __init__(self, results: "queue.Queue", on_progress: Optional[Callable[[str, Any], None]] = None):
+        self._results = results
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._progress: Dict[str, Any] = {}
+        self.on_progress = on_progress
+        self.finished = False
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+    
+    def cancel(self):
+        self._cancel.set()
+    
+    def check(self):
+        if self._cancel.is_set():
+            raise Cancelled()
+    
+    def report(self, key: str, value: Any):
+        """Queue progress for the UI thread, coalescing updates it has not drawn yet.
+        
+        Also the cancellation point for long-running work.
+        """
+        self.check()
+        if self.on_progress is None:
+            return
+        with self._lock:
+            flush = not self._progress
+            self._progress[key] = value
+        if flush:
+            self._results.put((self._flush_progress, ()))
+    
+    def _flush_progress(self):
+        with self._lock:
+            progress, self._progress = self._progress, {}
+        if not self.cancelled:
+            for key, value in progress.items():
+                self.on_progress(key, value)
+
+
+class TaskRunner:
+    """Thread pool whose results are applied on the Tk thread.
+    
+    Work runs off the UI thread; completion, error and progress callbacks are
+    queued and drained by root.after(), one at a time, so they can safely
+    touch widgets and index_data.
+    """
+    
+    def __init__(self, root, max_workers: int = 4, interval_ms: int = 16, budget_s: float = 0.008):
+        self.root = root
+        self.max_workers = max_workers
+        self.interval_ms = interval_ms
+        self.budget_s = budget_s
+        self.active: Set[Task] = set()
+        self._pool = None
+        self._results: "queue.Queue[Tuple[Optional[Callable], tuple]]" = queue.Queue()
+        self._polling = False
+    
+    @property
+    def busy(self) -> bool:
+        return bool(self.active)
+    
+    def submit(self, fn: Callable[..., Any], *args: Any,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None,
+               on_progress: Optional[Callable[[str, Any], None]] = None) -> Task:
+        """Run fn(task, *args) on a worker thread."""
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='release-editor')
+        task = Task(self._results, on_progress)
+        self.active.add(task)
+        self._pool.submit(self._run, task, fn, args, on_done, on_error, on_cancel)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.interval_ms, self._poll)
+        return task
+    
+    def cancel_all(self):
+        for task in list(self.active):
+            task.cancel()
+    
+    def shutdown(self):
+        self.cancel_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _run(self, task: Task, fn, args, on_done, on_error, on_cancel):
+        try:
+            result = fn(task, *args)
+        except Cancelled:
+            outcome = (on_cancel, ())
+        except Exception as e:
+            outcome = (on_error, (e,))
+        else:
+            outcome = (on_cancel, ()) if task.cancelled else (on_done, (result,))
+        self._results.put((self._finish, (task,) + outcome))
+    
+    def _finish(self, task: Task, callback, args):
+        task.finished = True
+        self.active.discard(task)
+        if callback is not None:
+            callback(*args)
+    
+    def _poll(self):
+        # Drain for at most one frame's budget so redraws keep up
+        deadline = time.perf_counter() + self.budget_s
+        while time.perf_counter() < deadline:
+            try:
+                callback, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        if self.active or not self._results.empty():
+            self.root.after(self.interval_ms, self._poll)
+        else:
+            self._polling = False
+
+
+def _import_tk():
+    global tk, ttk, messagebox, filedialog, scrolledtext
+    import tkinter
+    from tkinter import ttk as _ttk, messagebox as _messagebox, filedialog as _filedialog, scrolledtext as _scrolledtext
+    tk, ttk, messagebox, filedialog, scrolledtext = tkinter, _ttk, _messagebox, _filedialog, _scrolledtext
 
 
 class ReleaseEditor:
@@ -17,13 +2345,44 @@ class ReleaseEditor:
         self.root.title("Phasor Release Editor")
         self.root.geometry("1000x700")
         
-        self.index_data: Dict[str, Any] = {}
-        self.meta_data: Dict[str, Any] = {}
+        self.store = ReleaseIndex()
         self.current_version: Optional[str] = None
-        self.index_file_path = ""
-        self.meta_file_path = ""
+        self.tasks = TaskRunner(root)
+        self.load_task: Optional[Task] = None
+        self.save_task: Optional[Task] = None
+        self.versions = SortedVersions()
+        self.visible_versions = SortedVersions()
+        self._filter_job = None
+        self.hash_cache: Optional[HashCache] = None
+        self.force_rehash = tk.BooleanVar(value=False)
+        self.write_shards = tk.BooleanVar(value=False)
+        self.write_pages = tk.BooleanVar(value=False)
+        self.write_compact = tk.BooleanVar(value=False)
+        self.import_patterns = compile_import_patterns()
+        self.import_base_url = ""
+        self.watch_job = None
+        self.watch_task: Optional[Task] = None
+        self.watch_then: Optional[Callable[[], None]] = None
+        self.watch_interval = WATCH_INTERVAL_MS
         
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    @property
+    def index_data(self) -> Dict[str, Release]:
+        return self.store.data
+    
+    @property
+    def meta_data(self) -> Dict[str, Any]:
+        return self.store.meta
+    
+    @property
+    def index_file_path(self) -> str:
+        return self.store.path
+    
+    @property
+    def meta_file_path(self) -> str:
+        return self.store.meta_path
         
     def setup_ui(self):
         menubar = tk.Menu(self.root)
@@ -36,7 +2395,24 @@ class ReleaseEditor:
         file_menu.add_separator()
         file_menu.add_command(label="Save index.json", command=self.save_index)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
+        
+        edit_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Edit", menu=edit_menu)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo_edit)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo_edit)
+        self.root.bind('<Control-z>', lambda e: self.undo_edit())
+        self.root.bind('<Control-y>', lambda e: self.redo_edit())
+        self.root.bind('<Control-Z>', lambda e: self.redo_edit())
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Use Version on Disk", command=self.use_disk_version)
+        
+        options_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Options", menu=options_menu)
+        options_menu.add_checkbutton(label="Force Rehash (ignore hash cache)", variable=self.force_rehash)
+        options_menu.add_checkbutton(label="Write Per-Version Release Files", variable=self.write_shards)
+        options_menu.add_checkbutton(label="Write Prerendered Release Pages", variable=self.write_pages)
+        options_menu.add_checkbutton(label="Write Minified + Compressed JSON", variable=self.write_compact)
         
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -49,6 +2425,11 @@ class ReleaseEditor:
         list_frame = ttk.LabelFrame(main_frame, text="Versions", padding="5")
         list_frame.grid(row=0, column=0, rowspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(0, 5))
         
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(list_frame, textvariable=self.filter_var)
+        filter_entry.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        self.filter_var.trace_add('write', self.on_filter_change)
+        
         list_scroll = ttk.Scrollbar(list_frame)
         list_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -86,7 +2467,7 @@ class ReleaseEditor:
         row += 1
         ttk.Label(editor_frame, text="Type:").grid(row=row, column=0, sticky=tk.W, pady=2)
         self.type_var = tk.StringVar()
-        type_combo = ttk.Combobox(editor_frame, textvariable=self.type_var, values=["stable", "beta", "alpha", "rc"])
+        type_combo = ttk.Combobox(editor_frame, textvariable=self.type_var, values=RELEASE_TYPES)
         type_combo.grid(row=row, column=1, sticky=(tk.W, tk.E), pady=2, padx=(5, 0))
         
         row += 1
@@ -166,30 +2547,101 @@ class ReleaseEditor:
         ttk.Button(files_btn_frame, text="Add File", command=self.add_file).pack(side=tk.LEFT, padx=2)
         ttk.Button(files_btn_frame, text="Edit File", command=self.edit_file).pack(side=tk.LEFT, padx=2)
         ttk.Button(files_btn_frame, text="Delete File", command=self.delete_file).pack(side=tk.LEFT, padx=2)
+        ttk.Button(files_btn_frame, text="Hash from Files...", command=self.hash_from_files).pack(side=tk.LEFT, padx=2)
+        ttk.Button(files_btn_frame, text="Import Directory...", command=self.import_directory).pack(side=tk.LEFT, padx=2)
         
         save_frame = ttk.Frame(main_frame)
         save_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
         
         ttk.Button(save_frame, text="Save Changes", command=self.save_changes, 
                   style='Accent.TButton').pack(side=tk.RIGHT)
+        self.cancel_button = ttk.Button(save_frame, text="Cancel", command=self.cancel_tasks, state='disabled')
+        self.cancel_button.pack(side=tk.RIGHT, padx=(0, 5))
         
         self.status_var = tk.StringVar(value="Ready")
         ttk.Label(save_frame, textvariable=self.status_var, relief=tk.SUNKEN).pack(side=tk.LEFT, fill=tk.X, expand=True)
         
+    def run_task(self, description: str, fn: Callable[..., Any], *args: Any,
+                 on_done: Callable[[Any], None], error_message: str) -> Task:
+        """Run fn(task, *args) off the UI thread, reporting progress in the status bar."""
+        def progress(key: str, value: Any):
+            self.status_var.set(f"{description} {value}%")
+        
+        def done(result: Any):
+            self.update_task_state()
+            on_done(result)
+        
+        def failed(e: Exception):
+            self.update_task_state()
+            self.status_var.set(f"{description} failed")
+            messagebox.showerror("Error", f"{error_message}:\n{str(e)}")
+        
+        def cancelled():
+            self.update_task_state()
+            self.status_var.set(f"{description} cancelled")
+        
+        self.status_var.set(description)
+        task = self.tasks.submit(fn, *args, on_done=done, on_error=failed, on_cancel=cancelled, on_progress=progress)
+        self.update_task_state()
+        return task
+    
+    def update_task_state(self):
+        self.cancel_button.state(['!disabled'] if self.tasks.busy else ['disabled'])
+    
+    def cancel_tasks(self):
+        self.tasks.cancel_all()
+    
+    def on_close(self):
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+        self.tasks.shutdown()
+        # Unsaved edits stay in the journal and are recovered on the next load
+        self.store.close_journal()
+        self.root.destroy()
+    
+    def saving(self) -> bool:
+        """Whether a save is still writing; its end_save() must find the index it started from."""
+        if self.save_task is not None and not self.save_task.finished:
+            self.status_var.set("Wait for index.json to finish saving")
+            return True
+        return False
+    
     def load_index(self):
+        if self.load_task is not None and not self.load_task.finished:
+            self.status_var.set("Already loading index.json")
+            return
+        if self.saving():
+            return
         filename = filedialog.askopenfilename(
             title="Select index.json",
             filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
         )
         if filename:
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    self.index_data = json.load(f)
-                self.index_file_path = filename
+            def work(task: Task) -> Tuple[Dict[str, Release], Optional[List[int]]]:
+                stat = index_stat(filename)
+                return load_releases(filename, lambda done, total: task.report('read', done * 100 // max(total, 1))), stat
+            
+            def done(result: Tuple[Dict[str, Release], Optional[List[int]]]):
+                data, stat = result
+                self.store.set_loaded(filename, data)
+                recovered, stale = self.store.open_journal()
+                self.watch_loaded(filename, self.index_data, stat)
+                self.current_version = None
+                self.clear_fields()
                 self.populate_version_list()
-                self.status_var.set(f"Loaded: {os.path.basename(filename)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load index.json:\n{str(e)}")
+                status = f"Loaded: {os.path.basename(filename)}"
+                if recovered:
+                    status += f" (recovered unsaved edits to {recovered} version(s))"
+                self.status_var.set(status)
+                if recovered:
+                    messagebox.showinfo("Recovered Edits", f"Unsaved edits to {recovered} version(s) were "
+                                        "recovered from the journal.\nUse File > Save to write them.")
+                if stale:
+                    messagebox.showwarning("Journal Not Applied", "index.json changed since the unsaved edits "
+                                           f"were journaled, so they were not replayed.\nThey were kept in:\n{stale}")
+            
+            self.load_task = self.run_task(f"Loading {os.path.basename(filename)}...", work,
+                                           on_done=done, error_message="Failed to load index.json")
     
     def load_meta(self):
         filename = filedialog.askopenfilename(
@@ -197,15 +2649,39 @@ class ReleaseEditor:
             filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
         )
         if filename:
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    self.meta_data = json.load(f)
-                self.meta_file_path = filename
+            def work(task: Task) -> Tuple[Dict[str, Any], DiskState]:
+                stat = index_stat(filename)
+                with open(filename, 'rb') as f:
+                    body = f.read()
+                return json.loads(body.decode('utf-8-sig')), disk_state(body, stat, index=False)
+            
+            def done(result: Tuple[Dict[str, Any], DiskState]):
+                meta, state = result
+                self.store.set_meta(filename, meta)
+                self.store.meta_disk = state
+                self.watch_interval = WATCH_INTERVAL_MS
+                self.schedule_watch()
                 self.status_var.set(f"Loaded meta: {os.path.basename(filename)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load meta.json:\n{str(e)}")
+            
+            self.run_task(f"Loading {os.path.basename(filename)}...", work,
+                          on_done=done, error_message="Failed to load meta.json")
     
-    def save_index(self):
+    def save_index(self, checked: bool = False):
+        if self.save_task is not None and not self.save_task.finished:
+            self.status_var.set("Already saving index.json")
+            return
+        if self.load_task is not None and not self.load_task.finished:
+            self.status_var.set("Wait for index.json to finish loading")
+            return
+        if not checked and self.disk_changed():
+            # Merge what another writer saved first instead of silently overwriting it
+            self.status_var.set("index.json changed on disk, merging before saving...")
+            self.poll_disk(then=lambda: self.save_index(checked=True))
+            return
+        if self.store.conflicts and not messagebox.askyesno(
+                "Changed On Disk", f"{len(self.store.conflicts)} version(s) you edited were also changed on disk:\n"
+                f"{', '.join(sorted(self.store.conflicts, key=version_key))}\n\nOverwrite them with your edits?"):
+            return
         if not self.index_file_path:
             filename = filedialog.asksaveasfilename(
                 title="Save index.json",
@@ -214,23 +2690,137 @@ class ReleaseEditor:
             )
             if not filename:
                 return
-            self.index_file_path = filename
+            self.store.path = filename
         
-        try:
-            with open(self.index_file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.index_data, f, indent=4, ensure_ascii=False)
-            self.status_var.set(f"Saved: {os.path.basename(self.index_file_path)}")
-            messagebox.showinfo("Success", "index.json saved successfully!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save index.json:\n{str(e)}")
+        job = self.store.begin_save()
+        snapshot = job.data if job else self.store.snapshot()
+        conflicted = set(self.store.conflicts)
+        meta = self.meta_data
+        outputs = {'shards': self.write_shards.get(), 'pages': self.write_pages.get(),
+                   'compact': self.write_compact.get()}
+        
+        def work(task: Task):
+            try:
+                task.check()
+                body = self.store.write_save(job) if job else None
+                state = disk_state(body) if job else None
+                shards, pages, reports = self.store.save_outputs(snapshot, meta, **outputs)
+            finally:
+                self.store.release_snapshot()
+            return shards, pages, reports, state, body
+        
+        def done(result):
+            shards, pages, reports, state, body = result
+            if job and self.store.path != job.path:
+                # Another index was loaded meanwhile; the job is not about it
+                self.status_var.set(f"Saved: {os.path.basename(job.path)}")
+                return
+            if job:
+                self.store.end_save(job, body)
+                self.store.disk = state
+                self.refresh_versions(conflicted - self.store.conflicts.keys())
+                self.schedule_watch()
+                status = f"Saved: {os.path.basename(self.index_file_path)}"
+                message = "index.json saved successfully!"
+            else:
+                status = f"No changes to {os.path.basename(self.index_file_path)}"
+                message = "index.json is already up to date."
+            if shards and any(shards):
+                written, removed = shards
+                status += f" ({len(written)} release file(s) written, {len(removed)} removed)"
+            if pages:
+                written, removed = pages
+                status += f" ({len(written)} page(s) rendered, {len(removed)} removed)"
+            if reports:
+                message += "\n\n" + "\n".join(format_size_report(r) for r in reports)
+            self.status_var.set(status)
+            messagebox.showinfo("Success", message)
+        
+        self.save_task = self.run_task(f"Saving {os.path.basename(self.index_file_path)}...", work,
+                                       on_done=done, error_message="Failed to save index.json")
     
     def populate_version_list(self):
+        self.versions = SortedVersions(self.index_data.keys())
+        needle = self.filter_var.get().strip().lower()
+        self.visible_versions = SortedVersions(v for v in self.versions if self.version_matches(v, needle))
         self.version_listbox.delete(0, tk.END)
-        versions = sorted(self.index_data.keys(), 
-                         key=lambda v: [int(x) if x.isdigit() else x for x in v.split('.')],
-                         reverse=True)
+        if len(self.visible_versions):
+            self.version_listbox.insert(tk.END, *self.visible_versions)
+        for version in self.store.conflicts:
+            if version in self.visible_versions:
+                self.style_version_row(version, self.visible_versions.index(version))
+    
+    def version_matches(self, version: str, needle: str) -> bool:
+        if not needle or needle in version.lower():
+            return True
+        if version not in self.index_data:
+            return False
+        title, release_type = self.store.label(version)
+        return needle in str(release_type or '').lower() or needle in str(title or '').lower()
+    
+    def on_filter_change(self, *args):
+        # Debounce so typing a word filters once, not once per key
+        if self._filter_job is not None:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(120, self.apply_filter)
+    
+    def apply_filter(self):
+        """Bring the listbox in line with the filter, touching only rows that change."""
+        self._filter_job = None
+        needle = self.filter_var.get().strip().lower()
+        wanted = [v for v in self.versions if self.version_matches(v, needle)]
+        wanted_set = set(wanted)
+        
+        # Drop rows that no longer match, bottom up so row numbers stay valid
+        for version in reversed(list(self.visible_versions)):
+            if version not in wanted_set:
+                self.version_listbox.delete(self.visible_versions.remove(version))
+        
+        for version in wanted:
+            if version not in self.visible_versions:
+                row = self.visible_versions.insert(version)
+                self.version_listbox.insert(row, version)
+                if version in self.store.conflicts:
+                    self.style_version_row(version, row)
+    
+    def add_version_row(self, version: str) -> Optional[int]:
+        self.versions.insert(version)
+        return self.refresh_version_row(version)
+    
+    def remove_version_row(self, version: str):
+        if version in self.versions:
+            self.versions.remove(version)
+        if version in self.visible_versions:
+            self.version_listbox.delete(self.visible_versions.remove(version))
+    
+    def refresh_version_row(self, version: str) -> Optional[int]:
+        """Show or hide one version after its title/type changed; returns its row if shown."""
+        shown = version in self.visible_versions
+        if self.version_matches(version, self.filter_var.get().strip().lower()):
+            if shown:
+                row = self.visible_versions.index(version)
+            else:
+                row = self.visible_versions.insert(version)
+                self.version_listbox.insert(row, version)
+            self.style_version_row(version, row)
+            return row
+        if shown:
+            self.version_listbox.delete(self.visible_versions.remove(version))
+        return None
+    
+    def style_version_row(self, version: str, row: int):
+        # Versions in conflict with the file on disk are shown in red
+        self.version_listbox.itemconfigure(row, foreground='red' if version in self.store.conflicts else '')
+    
+    def refresh_versions(self, versions: Iterable[str]):
+        """Add, remove or refresh the rows of versions that were created, deleted or changed."""
         for version in versions:
-            self.version_listbox.insert(tk.END, version)
+            if version not in self.index_data:
+                self.remove_version_row(version)
+            elif version in self.versions:
+                self.refresh_version_row(version)
+            else:
+                self.add_version_row(version)
     
     def on_version_select(self, event):
         selection = self.version_listbox.curselection()
@@ -240,10 +2830,21 @@ class ReleaseEditor:
         version = self.version_listbox.get(selection[0])
         self.current_version = version
         self.load_version_data(version)
+        if version in self.store.conflicts:
+            self.status_var.set(f"{version} was also changed on disk; saving overwrites that, "
+                                "Edit > Use Version on Disk discards your edits")
     
     def load_version_data(self, version: str):
-        data = self.index_data.get(version, {})
+        data = self.index_data.get(version) or Release()
+        self.show_release_fields(version, data)
         
+        self.files_tree.delete(*self.files_tree.get_children())
+        files = data.get('files', {})
+        for key, file_data in files.items():
+            if isinstance(file_data, ReleaseFile):
+                self.files_tree.insert('', tk.END, text=key, values=(file_data.url, file_data.hash))
+    
+    def show_release_fields(self, version: str, data: Release):
         self.version_var.set(version)
         self.title_var.set(data.get('title', ''))
         self.commit_var.set(data.get('commit', ''))
@@ -258,53 +2859,69 @@ class ReleaseEditor:
         self.features_text.delete('1.0', tk.END)
         features = data.get('features', [])
         self.features_text.insert('1.0', '\n'.join(features))
-        
-        self.files_tree.delete(*self.files_tree.get_children())
-        files = data.get('files', {})
+    
+    def refresh_file_rows(self, files: Dict[str, Any]):
+        """Bring the files tree in line with files, touching only the rows that differ."""
+        items = {self.files_tree.item(item, 'text'): item for item in self.files_tree.get_children()}
+        row = 0
         for key, file_data in files.items():
-            url = file_data.get('url', '')
-            hash_val = file_data.get('hash', '')
-            self.files_tree.insert('', tk.END, text=key, values=(url, hash_val))
+            if not isinstance(file_data, ReleaseFile):
+                continue
+            values = (file_data.url, file_data.hash)
+            item = items.pop(key, None)
+            if item is None:
+                self.files_tree.insert('', row, text=key, values=values)
+            else:
+                if tuple(self.files_tree.item(item, 'values')) != values:
+                    self.files_tree.item(item, values=values)
+                if self.files_tree.index(item) != row:
+                    self.files_tree.move(item, '', row)
+            row += 1
+        if items:
+            self.files_tree.delete(*items.values())
     
-    def save_changes(self):
-        if not self.current_version:
-            messagebox.showwarning("Warning", "No version selected")
-            return
-        
-        data = {
+    def form_values(self) -> Tuple[Dict[str, Any], List[Tuple[str, str, str]]]:
+        """The release fields and (key, url, hash) file rows as entered in the form."""
+        fields = {
             'title': self.title_var.get(),
             'commit': self.commit_var.get(),
             'type': self.type_var.get(),
             'gh_release': self.gh_release_var.get(),
             'gh_changes': self.gh_changes_var.get(),
+            'vscode_release': self.vscode_release_var.get(),
+            'vs_release': self.vs_release_var.get(),
+            'src': self.src_var.get(),
+            'zip': self.zip_var.get(),
         }
         
-        if self.vscode_release_var.get():
-            data['vscode_release'] = self.vscode_release_var.get()
-        
-        if self.vs_release_var.get():
-            data['vs_release'] = self.vs_release_var.get()
-        
         features_text = self.features_text.get('1.0', tk.END).strip()
-        data['features'] = [f.strip() for f in features_text.split('\n') if f.strip()]
+        fields['features'] = tuple(f.strip() for f in features_text.split('\n') if f.strip())
         
-        files = {}
+        files = []
         for item in self.files_tree.get_children():
-            key = self.files_tree.item(item, 'text')
             values = self.files_tree.item(item, 'values')
-            files[key] = {
-                'url': values[0],
-                'hash': values[1]
-            }
-        data['files'] = files
-        
-        if self.src_var.get():
-            data['src'] = self.src_var.get()
-        
-        if self.zip_var.get():
-            data['zip'] = self.zip_var.get()
+            files.append((self.files_tree.item(item, 'text'), values[0], values[1]))
+        return fields, files
+    
+    def form_changed(self) -> bool:
+        """Whether the form holds edits to the current version not yet applied with Save Changes."""
+        release = self.index_data.get(self.current_version) if self.current_version else None
+        if release is None:
+            return False
+        fields, files = self.form_values()
+        current = [(key, f.url, f.hash) for key, f in release.files.items() if isinstance(f, ReleaseFile)]
+        return bool(release.changed_fields(fields)) or files != current
+    
+    def save_changes(self):
+        if not self.current_version:
+            messagebox.showwarning("Warning", "No version selected")
+            return
         
-        self.index_data[self.current_version] = data
+        fields, files = self.form_values()
+        if not self.store.edit_version(self.current_version, fields, files):
+            self.status_var.set(f"No changes to {self.current_version}")
+            return
+        self.refresh_version_row(self.current_version)
         self.status_var.set(f"Changes saved to {self.current_version}")
         messagebox.showinfo("Success", f"Changes to {self.current_version} saved in memory.\nUse File > Save to write to disk.")
     
@@ -322,32 +2939,14 @@ class ReleaseEditor:
         
         def create():
             version = version_entry.get().strip()
-            if not version:
-                messagebox.showwarning("Warning", "Version number cannot be empty")
-                return
-            
-            if version in self.index_data:
-                messagebox.showwarning("Warning", f"Version {version} already exists")
+            try:
+                self.store.new_version(version)
+            except ValueError as e:
+                messagebox.showwarning("Warning", str(e))
                 return
             
-            # Create new version with template
-            self.index_data[version] = {
-                'title': version,
-                'commit': '',
-                'type': 'beta',
-                'gh_release': '',
-                'gh_changes': '',
-                'features': [],
-                'files': {}
-            }
-            
-            self.populate_version_list()
-            # Select the new version
-            versions = list(self.version_listbox.get(0, tk.END))
-            if version in versions:
-                self.version_listbox.selection_clear(0, tk.END)
-                self.version_listbox.selection_set(versions.index(version))
-                self.version_listbox.event_generate('<<ListboxSelect>>')
+            self.add_version_row(version)
+            self.select_version(version)
             
             dialog.destroy()
         
@@ -363,12 +2962,161 @@ class ReleaseEditor:
         
         if messagebox.askyesno("Confirm Delete", 
                               f"Are you sure you want to delete version {version}?"):
-            del self.index_data[version]
-            self.populate_version_list()
+            self.store.delete_version(version)
+            self.remove_version_row(version)
             self.current_version = None
             self.clear_fields()
             self.status_var.set(f"Deleted version {version}")
     
+    def undo_edit(self):
+        self.show_history_step(self.store.undo(), "Undid", "Nothing to undo")
+    
+    def redo_edit(self):
+        self.show_history_step(self.store.redo(), "Redid", "Nothing to redo")
+    
+    def show_history_step(self, step: Optional[Tuple[str, Set[str]]], verb: str, empty: str):
+        if step is None:
+            self.status_var.set(empty)
+            return
+        label, touched = step
+        self.refresh_versions(touched)
+        if self.current_version in touched:
+            if self.current_version in self.index_data:
+                self.load_version_data(self.current_version)
+            else:
+                self.current_version = None
+                self.clear_fields()
+        self.status_var.set(f"{verb}: {label}")
+    
+    def use_disk_version(self):
+        version = self.current_version
+        if version not in self.store.conflicts:
+            self.status_var.set("The selected version is not in conflict with the file on disk")
+            return
+        self.store.take_disk_version(version)
+        self.show_history_step((f"Use {version} from disk", {version}), "Applied", "")
+    
+    def watch_loaded(self, path: str, data: Dict[str, Release], stat: Optional[List[int]]):
+        """Start watching index.json, taking what check_disk() compares against in the background."""
+        loaded = None if isinstance(data, LazyReleases) else list(data)
+        
+        def work(task: Task) -> DiskState:
+            if isinstance(data, LazyReleases):
+                # The body is the loaded file even if it has been replaced since
+                return disk_state(data.body, stat)
+            with open(path, 'rb') as f:
+                body = f.read()
+            if index_stat(path) != stat:
+                # Replaced since it was loaded: the first check compares every version
+                return DiskState(None, '', dict.fromkeys(loaded, b''))
+            return disk_state(body, stat)
+        
+        def done(state: DiskState):
+            if self.index_file_path == path and self.store.disk is None:
+                self.store.disk = state
+                self.watch_interval = WATCH_INTERVAL_MS
+                self.schedule_watch()
+        
+        self.tasks.submit(work, on_done=done)
+    
+    def disk_changed(self) -> bool:
+        disk = self.store.disk
+        return disk is not None and index_stat(self.index_file_path) != disk.stat
+    
+    def schedule_watch(self):
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+            self.watch_job = None
+        if self.store.disk is not None or self.store.meta_disk is not None:
+            self.watch_job = self.root.after(self.watch_interval, self.poll_disk)
+    
+    def poll_disk(self, then: Optional[Callable[[], None]] = None):
+        """Look for changes other writers made to index.json and meta.json, then call then().
+        
+        Only a stat of each file happens here; a file whose stat moved is
+        hashed and its changed versions decoded on a worker. The interval
+        doubles while nothing changes.
+        """
+        self.watch_job = None
+        if then is not None:
+            self.watch_then = then
+        if self.watch_task is not None and not self.watch_task.finished:
+            # Its completion runs watch_then
+            return
+        checks = []
+        if self.store.disk is not None and self.index_file_path and self.disk_changed():
+            checks.append((self.index_file_path, self.store.disk, True))
+        meta = self.store.meta_disk
+        if meta is not None and self.meta_file_path and index_stat(self.meta_file_path) != meta.stat:
+            checks.append((self.meta_file_path, meta, False))
+        if not checks or (self.load_task is not None and not self.load_task.finished):
+            self.watch_interval = min(self.watch_interval * 2, WATCH_MAX_INTERVAL_MS)
+            self.finish_watch()
+            return
+        
+        def work(task: Task):
+            return [(base, check_disk(path, base, index)) for path, base, index in checks]
+        
+        def done(results: List[Tuple[DiskState, Optional[DiskChange]]]):
+            changed = False
+            for base, change in results:
+                if change is None:
+                    continue
+                if base is self.store.disk:
+                    changed = self.apply_disk_change(change) or changed
+                elif base is self.store.meta_disk:
+                    self.store.merge_meta(change)
+                    if change.meta is not None:
+                        changed = True
+                        self.status_var.set(f"Reloaded {os.path.basename(self.meta_file_path)} (changed on disk)")
+                # Otherwise a load or save replaced the state this was checked against
+            self.watch_interval = WATCH_INTERVAL_MS if changed else min(self.watch_interval * 2, WATCH_MAX_INTERVAL_MS)
+            self.finish_watch()
+        
+        def failed(e: Exception):
+            # Likely caught mid-write by a writer that does not replace the file atomically; retried next poll
+            then, self.watch_then = self.watch_then, None
+            self.watch_interval = WATCH_INTERVAL_MS
+            self.status_var.set(f"Could not read the changed file: {e}")
+            self.schedule_watch()
+            if then is not None and messagebox.askyesno(
+                    "Changed On Disk", f"index.json changed on disk but could not be read:\n{e}\n\nSave over it anyway?"):
+                then()
+        
+        self.watch_task = self.tasks.submit(work, on_done=done, on_error=failed, on_cancel=self.finish_watch)
+    
+    def finish_watch(self):
+        then, self.watch_then = self.watch_then, None
+        self.schedule_watch()
+        if then is not None:
+            then()
+    
+    def apply_disk_change(self, change: DiskChange) -> bool:
+        """Merge a DiskChange into the open index, refreshing only the rows it affects."""
+        if not change.releases:
+            self.store.disk = change.state
+            return False
+        current = self.current_version
+        # Typed but unapplied form edits count as local edits too
+        keep = (current,) if current in change.releases and self.form_changed() else ()
+        merged, conflicted = self.store.merge_disk(change, keep)
+        if not merged and not conflicted:
+            return False
+        self.refresh_versions(merged | conflicted)
+        if current in merged:
+            release = self.index_data.get(current)
+            if release is None:
+                self.current_version = None
+                self.clear_fields()
+            else:
+                self.show_release_fields(current, release)
+                self.refresh_file_rows(release.files if isinstance(release.files, dict) else {})
+        status = f"{len(merged)} version(s) changed on disk were merged"
+        if conflicted:
+            status += f"; {len(conflicted)} you also edited are marked in red"
+        self.status_var.set(status)
+        return True
+    
     def clear_fields(self):
         self.version_var.set('')
         self.title_var.set('')
@@ -386,7 +3134,7 @@ class ReleaseEditor:
     def add_file(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("Add File")
-        dialog.geometry("500x200")
+        dialog.geometry("600x200")
         dialog.transient(self.root)
         dialog.grab_set()
         
@@ -403,6 +3151,8 @@ class ReleaseEditor:
         ttk.Label(dialog, text="SHA256 Hash:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
         hash_var = tk.StringVar()
         ttk.Entry(dialog, textvariable=hash_var, width=40).grid(row=2, column=1, padx=10, pady=5)
+        ttk.Button(dialog, text="From File...",
+                   command=lambda: self.hash_into_var(dialog, hash_var)).grid(row=2, column=2, padx=(0, 10), pady=5)
         
         def add():
             key = key_var.get().strip()
@@ -430,7 +3180,7 @@ class ReleaseEditor:
         
         dialog = tk.Toplevel(self.root)
         dialog.title("Edit File")
-        dialog.geometry("500x200")
+        dialog.geometry("600x200")
         dialog.transient(self.root)
         dialog.grab_set()
         
@@ -445,6 +3195,8 @@ class ReleaseEditor:
         ttk.Label(dialog, text="SHA256 Hash:").grid(row=2, column=0, sticky=tk.W, padx=10, pady=5)
         hash_var = tk.StringVar(value=values[1])
         ttk.Entry(dialog, textvariable=hash_var, width=40).grid(row=2, column=1, padx=10, pady=5)
+        ttk.Button(dialog, text="From File...",
+                   command=lambda: self.hash_into_var(dialog, hash_var)).grid(row=2, column=2, padx=(0, 10), pady=5)
         
         def save():
             url = url_var.get().strip()
@@ -463,12 +3215,658 @@ class ReleaseEditor:
         if messagebox.askyesno("Confirm Delete", "Delete selected file?"):
             self.files_tree.delete(selection[0])
 
+    
+    def hash_from_files(self):
+        filenames = filedialog.askopenfilenames(title="Select artifacts to hash")
+        if not filenames:
+            return
+        
+        rows = {}
+        for item in self.files_tree.get_children():
+            name = url_basename(self.files_tree.item(item, 'values')[0])
+            if name:
+                rows.setdefault(name, item)
+        
+        selection = self.files_tree.selection()
+        targets = {}
+        unmatched = []
+        for path in filenames:
+            item = rows.get(os.path.basename(path))
+            if item is None and len(filenames) == 1 and selection:
+                item = selection[0]
+            if item is None:
+                unmatched.append(os.path.basename(path))
+            else:
+                targets[path] = item
+        
+        if unmatched:
+            messagebox.showwarning("Warning", "No file row has a URL ending in:\n" + "\n".join(unmatched))
+        if not targets:
+            return
+        
+        def apply(results: Dict[str, str]):
+            for path, digest in results.items():
+                item = targets[path]
+                if self.files_tree.exists(item):
+                    url = self.files_tree.item(item, 'values')[0]
+                    self.files_tree.item(item, values=(url, digest))
+            self.status_var.set(f"Hashed {len(results)} file(s)")
+        
+        self.hash_local_files(list(targets), apply)
+    
+    def hash_into_var(self, parent, hash_var: tk.StringVar):
+        filename = filedialog.askopenfilename(title="Select artifact to hash", parent=parent)
+        if not filename:
+            return
+        
+        def apply(results: Dict[str, str]):
+            if filename in results:
+                hash_var.set(results[filename])
+        
+        self.hash_local_files([filename], apply, parent=parent)
+    
+    def import_directory(self):
+        if self.saving():
+            return
+        directory = filedialog.askdirectory(title="Select build output directory")
+        if not directory:
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Import from Directory")
+        dialog.geometry("600x150")
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        ttk.Label(dialog, text="Version:").grid(row=0, column=0, sticky=tk.W, padx=10, pady=5)
+        version_var = tk.StringVar(value=self.current_version or '')
+        ttk.Entry(dialog, textvariable=version_var, width=50).grid(row=0, column=1, padx=10, pady=5)
+        
+        ttk.Label(dialog, text="Base URL:").grid(row=1, column=0, sticky=tk.W, padx=10, pady=5)
+        base_var = tk.StringVar(value=release_download_base(self.gh_release_var.get()) or self.import_base_url)
+        ttk.Entry(dialog, textvariable=base_var, width=50).grid(row=1, column=1, padx=10, pady=5)
+        
+        def start():
+            version = version_var.get().strip()
+            if not version:
+                messagebox.showwarning("Warning", "Version number cannot be empty", parent=dialog)
+                return
+            self.import_base_url = base_var.get().strip()
+            dialog.destroy()
+            if not self.saving():
+                self.run_import(directory, version, self.import_base_url)
+        
+        ttk.Button(dialog, text="Import", command=start).grid(row=2, column=1, pady=10, sticky=tk.E)
+    
+    def run_import(self, directory: str, version: str, base_url: str):
+        """Scan and hash directory off the UI thread, then fill version's file rows."""
+        keys = list(self.meta_data) or None
+        patterns = self.import_patterns
+        cache = self.get_hash_cache()
+        force = self.force_rehash.get()
+        
+        def work(task: Task):
+            def progress(done: int, total: int):
+                task.report('hash', done * 100 // max(total, 1))
+            return import_artifacts(directory, base_url, patterns, keys, cache, force, progress)
+        
+        def done(result):
+            files, unmatched, errors = result
+            if version not in self.index_data:
+                self.store.new_version(version)
+                self.add_version_row(version)
+            if self.current_version != version:
+                self.select_version(version)
+            
+            # Fill the form; Save Changes commits it like any other file edit
+            rows = {self.files_tree.item(item, 'text'): item for item in self.files_tree.get_children()}
+            for key, file_data in files.items():
+                values = (file_data['url'], file_data['hash'])
+                if key in rows:
+                    self.files_tree.item(rows[key], values=values)
+                else:
+                    self.files_tree.insert('', tk.END, text=key, values=values)
+            
+            self.status_var.set(f"Imported {len(files)} file(s) into {version}, use Save Changes to keep them")
+            notes = []
+            if unmatched:
+                notes.append("Not matched to a meta.json key:\n" + "\n".join(unmatched))
+            if errors:
+                notes.append("Failed to hash:\n" + "\n".join(errors))
+            if notes:
+                messagebox.showwarning("Import", "\n\n".join(notes))
+        
+        self.run_task(f"Importing {os.path.basename(directory)}...", work,
+                      on_done=done, error_message="Failed to import directory")
+    
+    def select_version(self, version: str):
+        if version not in self.visible_versions:
+            self.filter_var.set('')
+            self.apply_filter()
+        row = self.visible_versions.index(version)
+        self.version_listbox.selection_clear(0, tk.END)
+        self.version_listbox.selection_set(row)
+        self.version_listbox.see(row)
+        self.current_version = version
+        self.load_version_data(version)
+    
+    def get_hash_cache(self) -> HashCache:
+        db_path = HashCache.path_for_index(self.index_file_path)
+        if self.hash_cache is None or self.hash_cache.db_path != db_path:
+            if self.hash_cache is not None:
+                self.hash_cache.close()
+            self.hash_cache = HashCache(db_path)
+        return self.hash_cache
+    
+    def hash_local_files(self, paths: List[str], on_done: Callable[[Dict[str, str]], None], parent=None):
+        """Hash paths on a thread pool, showing per-file progress in a modal dialog."""
+        dialog = tk.Toplevel(parent or self.root)
+        dialog.title("Hashing Files")
+        dialog.geometry("600x300")
+        dialog.transient(parent or self.root)
+        dialog.grab_set()
+        
+        tree = ttk.Treeview(dialog, columns=('Size', 'Progress'), height=10)
+        tree.heading('#0', text='File')
+        tree.heading('Size', text='Size')
+        tree.heading('Progress', text='Progress')
+        tree.column('#0', width=330)
+        tree.column('Size', width=100, anchor=tk.E)
+        tree.column('Progress', width=120, anchor=tk.E)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        
+        total_var = tk.DoubleVar(value=0)
+        ttk.Progressbar(dialog, variable=total_var, maximum=len(paths)).pack(fill=tk.X, padx=10, pady=(0, 5))
+        
+        rows = {}
+        for path in paths:
+            try:
+                size = f"{os.path.getsize(path) / (1024 * 1024):.1f} MB"
+            except OSError:
+                size = "?"
+            rows[path] = tree.insert('', tk.END, text=os.path.basename(path), values=(size, "queued"))
+        
+        cache = self.get_hash_cache()
+        force = self.force_rehash.get()
+        
+        def work(task: Task) -> Tuple[Dict[str, str], List[str]]:
+            def progress(path: str, done: int, total: int):
+                task.report(path, 100 if not total else done * 100 // total)
+            
+            results: Dict[str, str] = {}
+            errors: List[str] = []
+            for path, digest, error in hash_files(paths, progress, cache=cache, force=force):
+                if isinstance(error, Cancelled):
+                    raise error
+                if error is None:
+                    results[path] = digest
+                else:
+                    errors.append(f"{os.path.basename(path)}: {error}")
+                task.report(path, "done" if error is None else "error")
+            return results, errors
+        
+        finished = set()
+        
+        def progress(path: str, value: Any):
+            tree.set(rows[path], 'Progress', value if isinstance(value, str) else f"{value}%")
+            if isinstance(value, str) and path not in finished:
+                finished.add(path)
+                total_var.set(len(finished))
+        
+        def done(result: Tuple[Dict[str, str], List[str]]):
+            results, errors = result
+            self.update_task_state()
+            dialog.destroy()
+            if errors:
+                messagebox.showerror("Error", "Failed to hash:\n" + "\n".join(errors))
+            on_done(results)
+        
+        def failed(e: Exception):
+            self.update_task_state()
+            dialog.destroy()
+            messagebox.showerror("Error", f"Failed to hash files:\n{str(e)}")
+        
+        def cancelled():
+            self.update_task_state()
+            dialog.destroy()
+            self.status_var.set("Hashing cancelled")
+        
+        task = self.tasks.submit(work, on_done=done, on_error=failed, on_cancel=cancelled, on_progress=progress)
+        self.update_task_state()
+        ttk.Button(dialog, text="Cancel", command=task.cancel).pack(side=tk.RIGHT, padx=10, pady=(0, 10))
+        dialog.protocol("WM_DELETE_WINDOW", task.cancel)
+
+
+class Profiler:
+    """Collects timed spans and writes them as Chrome trace events or a summary table.
+    
+    Nothing in the editor checks for a profiler: install_profiler() wraps the
+    functions worth timing, so an unprofiled run pays nothing.
+    """
+    
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.threads: Dict[int, str] = {}
+        self.lock = threading.Lock()
+        self.start = time.perf_counter_ns()
+    
+    def record(self, name: str, start: int, end: int, args: Optional[Dict[str, Any]] = None):
+        thread = threading.current_thread()
+        event = {'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': thread.ident,
+                 'ts': (start - self.start) / 1000, 'dur': (end - start) / 1000}
+        if args:
+            event['args'] = args
+        with self.lock:
+            self.events.append(event)
+            self.threads.setdefault(thread.ident, thread.name)
+    
+    def wrap(self, name: str, fn: Callable[..., Any],
+             sizes: Optional[Callable[[tuple, Dict[str, Any], Any], Dict[str, Any]]] = None) -> Callable[..., Any]:
+        """Time every call of fn; sizes(args, kwargs, result) adds byte/row counts to the span.
+        
+        Generators are timed from the first item to the last, with the number
+        of items yielded as the size.
+        """
+        # Only profiled runs pay for importing inspect
+        import inspect
+        
+        def measure(args, kwargs, result) -> Optional[Dict[str, Any]]:
+            try:
+                return sizes(args, kwargs, result) if sizes else None
+            except Exception:
+                return None
+        
+        if inspect.isgeneratorfunction(fn):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                count = 0
+                try:
+                    for item in fn(*args, **kwargs):
+                        count += 1
+                        yield item
+                finally:
+                    self.record(name, start, time.perf_counter_ns(), {'items': count})
+        else:
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                result = None
+                try:
+                    result = fn(*args, **kwargs)
+                    return result
+                finally:
+                    self.record(name, start, time.perf_counter_ns(), measure(args, kwargs, result))
+        wrapper.__name__ = fn.__name__
+        wrapper.__qualname__ = fn.__qualname__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+    
+    def trace(self) -> Dict[str, Any]:
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        pid = os.getpid()
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in threads.items()]
+        return {'traceEvents': names + events, 'displayTimeUnit': 'ms'}
+    
+    def summary(self) -> str:
+        """One row per span name: calls, total/mean/max milliseconds and summed sizes."""
+        with self.lock:
+            events = list(self.events)
+        spans: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            span = spans.setdefault(event['name'], {'calls': 0, 'total': 0.0, 'max': 0.0, 'sizes': {}})
+            span['calls'] += 1
+            span['total'] += event['dur']
+            span['max'] = max(span['max'], event['dur'])
+            for key, value in event.get('args', {}).items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    span['sizes'][key] = span['sizes'].get(key, 0) + value
+        
+        rows = [('span', 'calls', 'total ms', 'mean ms', 'max ms', 'sizes')]
+        for name, span in sorted(spans.items(), key=lambda item: -item[1]['total']):
+            sizes = ', '.join(f"{key}={value}" for key, value in span['sizes'].items())
+            rows.append((name, str(span['calls']), f"{span['total'] / 1000:.2f}",
+                         f"{span['total'] / 1000 / span['calls']:.2f}", f"{span['max'] / 1000:.2f}", sizes))
+        widths = [max(len(row[i]) for row in rows) for i in range(5)]
+        lines = []
+        for row in rows:
+            cells = [row[0].ljust(widths[0])] + [cell.rjust(width) for cell, width in zip(row[1:5], widths[1:])]
+            lines.append('  '.join(cells + [row[5]]).rstrip())
+        return '\n'.join(lines)
+    
+    def dump(self, path: str):
+        """Write the trace to path, or the summary table to stderr when path is '-'."""
+        if path == '-':
+            print(self.summary(), file=sys.stderr)
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(), f)
+
+
+def _file_size(path: str) -> Optional[int]:
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+def _pair_sizes(args, kwargs, result) -> Dict[str, Any]:
+    written, removed = result
+    return {'written': len(written), 'removed': len(removed)}
+
+
+def install_profiler(profiler: Profiler):
+    """Wrap the loading, saving, hashing and list-building code paths in profiler spans."""
+    g = globals()
+    functions = {
+        'read_json': lambda a, kw, r: {'bytes': _file_size(a[0])},
+        'load_releases': lambda a, kw, r: {'bytes': _file_size(a[0]), 'versions': len(r),
+                                           'lazy': isinstance(r, LazyReleases)},
+        'sha256_file': lambda a, kw, r: {'bytes': _file_size(a[0])},
+        'hash_files': None,
+        'write_stamped': lambda a, kw, r: {'bytes': len(a[1])},
+        'write_latest': lambda a, kw, r: {'written': int(r)},
+        'write_compact': lambda a, kw, r: {'bytes': r['min']},
+        'import_artifacts': None,
+        'verify_release_history': lambda a, kw, r: {'entries': len(r['entries'])},
+        'check_disk': lambda a, kw, r: {'changed': len(r.releases)} if r else None,
+    }
+    for name, sizes in functions.items():
+        g[name] = profiler.wrap(name, g[name], sizes)
+    
+    methods = {
+        LazyReleases: {
+            'decode': lambda a, kw, r: {'bytes': a[2][1] - a[2][0]},
+        },
+        ReleaseIndex: {
+            'set_loaded': lambda a, kw, r: {'versions': len(a[2])},
+            'set_meta': lambda a, kw, r: {'keys': len(a[2])},
+            'begin_save': lambda a, kw, r: {'changed': len(r.changed) if r and r.changed is not None else None},
+            'write_save': lambda a, kw, r: {'bytes': _file_size(a[0].path)},
+            'end_save': None,
+            'save_shards': _pair_sizes,
+            'save_pages': _pair_sizes,
+            'edit_version': lambda a, kw, r: {'changed': int(r)},
+            'open_journal': lambda a, kw, r: {'recovered': r[0]},
+            'compact_journal': None,
+            'merge_disk': lambda a, kw, r: {'merged': len(r[0]), 'conflicts': len(r[1])},
+            'validate': lambda a, kw, r: {'problems': len(r)},
+        },
+        ReleaseEditor: {
+            'populate_version_list': lambda a, kw, r: {'rows': len(a[0].visible_versions)},
+            'apply_filter': lambda a, kw, r: {'rows': len(a[0].visible_versions)},
+            'load_version_data': lambda a, kw, r: {'rows': len(a[0].files_tree.get_children())},
+        },
+    }
+    for cls, wrapped in methods.items():
+        for name, sizes in wrapped.items():
+            fn = cls.__dict__[name]
+            if isinstance(fn, staticmethod):
+                setattr(cls, name, staticmethod(profiler.wrap(f"{cls.__name__}.{name}", fn.__func__, sizes)))
+            else:
+                setattr(cls, name, profiler.wrap(f"{cls.__name__}.{name}", fn, sizes))
+    
+    # The editor methods that start loads, saves and imports mostly wait in
+    # file dialogs; time the work they hand to the pool instead, one span per
+    # task named after its closure (e.g. "ReleaseEditor.load_index.work")
+    run = TaskRunner._run
+    
+    def run_task(runner, task, fn, *args):
+        start = time.perf_counter_ns()
+        try:
+            run(runner, task, fn, *args)
+        finally:
+            profiler.record(fn.__qualname__.replace('.<locals>', ''), start, time.perf_counter_ns(),
+                            {'cancelled': task.cancelled})
+    
+    TaskRunner._run = run_task
+
 
-def main():
+def cmd_add_version(store: ReleaseIndex, args: argparse.Namespace) -> int:
+    store.new_version(
+        args.version,
+        title=args.title,
+        commit=args.commit,
+        type=args.type,
+        gh_release=args.gh_release,
+        gh_changes=args.gh_changes,
+        vscode_release=args.vscode_release,
+        vs_release=args.vs_release,
+        src=args.src,
+        zip=args.zip,
+        features=args.feature,
+    )
+    store.save()
+    print(f"Added {args.version}")
+    return 0
+
+
+def cmd_set_file(store: ReleaseIndex, args: argparse.Namespace) -> int:
+    entries = [entry.partition('=') for entry in args.entries]
+    if len(entries) > 1 and (args.url is not None or args.hash is not None):
+        raise ValueError("--url and --hash can only be used with a single KEY")
+    
+    paths = {path: key for key, _, path in entries if path}
+    cache = None if args.no_cache else HashCache(HashCache.path_for_index(store.path))
+    digests = {}
+    for path, digest, error in hash_files(list(paths), cache=cache, force=args.force):
+        if error is not None:
+            raise ValueError(f"Failed to hash {path}: {error}")
+        digests[path] = digest
+    
+    for key, _, path in entries:
+        url, hash_val = args.url, args.hash
+        if path:
+            hash_val = digests[path]
+            if args.base_url:
+                url = artifact_url(args.base_url, os.path.basename(path))
+        store.set_file(args.version, key, url, hash_val)
+        print(f"{args.version}/{key}: {store.data[args.version].files[key].hash or '(no hash)'}")
+    store.save()
+    return 0
+
+
+def cmd_import_dir(store: ReleaseIndex, args: argparse.Namespace) -> int:
+    extra = []
+    for rule in args.pattern or []:
+        pattern, sep, key = rule.rpartition('=')
+        if not sep or not pattern:
+            raise ValueError(f"--pattern expects REGEX=KEY, got {rule!r}")
+        extra.append((pattern, key))
+    
+    if args.version not in store.data:
+        store.new_version(args.version)
+    base_url = args.base_url
+    if base_url is None:
+        base_url = release_download_base(store.data[args.version].get('gh_release', ''))
+    cache = None if args.no_cache else HashCache(HashCache.path_for_index(store.path))
+    files, unmatched, errors = import_artifacts(args.directory, base_url, compile_import_patterns(extra),
+                                                list(store.meta) or None, cache, args.force)
+    for name in unmatched:
+        print(f"unmatched: {name}", file=sys.stderr)
+    for error in errors:
+        print(f"error: {error}", file=sys.stderr)
+    
+    for key, file_data in files.items():
+        store.set_file(args.version, key, file_data['url'], file_data['hash'])
+        print(f"{args.version}/{key}: {file_data['url']}")
+    store.save()
+    return 1 if errors else 0
+
+
+def cmd_verify(store: ReleaseIndex, args: argparse.Namespace) -> int:
+    cache = None
+    if not args.no_cache and not args.source.startswith(('http://', 'https://')):
+        cache = HashCache(HashCache.path_for_index(store.path))
+    report = verify_release_history(store.data, args.source, args.workers, cache)
+    body = json.dumps(report, indent=4, ensure_ascii=False)
+    if args.output == '-':
+        sys.stdout.write(body + '\n')
+    else:
+        atomic_write(args.output, body.encode('utf-8'))
+    print(', '.join(f"{count} {status}" for status, count in report['summary'].items()), file=sys.stderr)
+    return 1 if any(report['summary'][status] for status in VERIFY_FAILURES) else 0
+
+
+def cmd_hash(store: ReleaseIndex, args: argparse.Namespace) -> int:
+    cache = None if args.no_cache else HashCache(HashCache.path_for_index(store.path))
+    status = 0
+    results = {}
+    for path, digest, error in hash_files(args.paths, cache=cache, force=args.force):
+        if error is not None:
+            print(f"{path}: {error}", file=sys.stderr)
+            status = 1
+        else:
+            results[path] = digest
+    # Same layout as sha256sum, in the order given
+    for path in args.paths:
+        if path in results:
+            print(f"{results[path]}  {path}")
+    return status
+
+
+def cmd_validate(store: ReleaseIndex, args: argparse.Namespace) -> int:
+    problems = store.validate()
+    for problem in problems:
+        print(problem)
+    print(f"{len(store.data)} versions, {len(problems)} problem(s)", file=sys.stderr)
+    return 1 if problems else 0
+
+
+def cmd_export(store: ReleaseIndex, args: argparse.Namespace) -> int:
+    if args.output == '-':
+        sys.stdout.write(store.dumps() + '\n')
+    elif not store.save(args.output):
+        print(f"{args.output} is up to date", file=sys.stderr)
+    if args.shards is not None:
+        written, removed = store.save_shards(args.shards or None)
+        print(f"{len(written)} release file(s) written, {len(removed)} removed", file=sys.stderr)
+    if args.html is not None:
+        written, removed = store.save_pages(args.html or None)
+        print(f"{len(written)} page(s) rendered, {len(removed)} removed", file=sys.stderr)
+    if args.minify:
+        if args.output == '-':
+            raise ValueError("--minify needs --output or an index file to write next to")
+        for report in store.save_compact():
+            print(format_size_report(report), file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Phasor Release Editor. Opens the GUI when run without a command.")
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help="path to index.json")
+    parser.add_argument('--meta', help="path to meta.json (default: next to index.json)")
+    parser.add_argument('--profile', action='store_true',
+                        help="time loading, saving and hashing and print a summary table to stderr on exit")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="like --profile, but write the spans to FILE as Chrome trace events")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    
+    p = commands.add_parser('add-version', help="create a new release")
+    p.add_argument('version')
+    p.add_argument('--title')
+    p.add_argument('--type', choices=RELEASE_TYPES)
+    p.add_argument('--commit')
+    p.add_argument('--gh-release')
+    p.add_argument('--gh-changes')
+    p.add_argument('--vscode-release')
+    p.add_argument('--vs-release')
+    p.add_argument('--src', help="source .tar.gz URL")
+    p.add_argument('--zip', help="source .zip URL")
+    p.add_argument('--feature', action='append', help="feature line, may be repeated")
+    p.set_defaults(func=cmd_add_version, needs_index=False)
+    
+    p = commands.add_parser('set-file', help="add or update file entries of a release")
+    p.add_argument('version')
+    p.add_argument('entries', nargs='+', metavar='KEY[=PATH]',
+                   help="meta.json key, optionally with a local artifact to hash")
+    p.add_argument('--url', help="file URL (single KEY only)")
+    p.add_argument('--hash', help="SHA-256 hex digest (single KEY only)")
+    p.add_argument('--base-url', help="derive each URL as BASE_URL/<artifact file name>")
+    p.add_argument('--force', action='store_true', help="ignore the hash cache")
+    p.add_argument('--no-cache', action='store_true', help="do not read or write the hash cache")
+    p.set_defaults(func=cmd_set_file, needs_index=True)
+    
+    p = commands.add_parser('import-dir', help="add every recognised artifact in a build output directory")
+    p.add_argument('version')
+    p.add_argument('directory')
+    p.add_argument('--base-url', help="URL prefix for the artifacts (default: from the release's gh_release)")
+    p.add_argument('--pattern', action='append', metavar='REGEX=KEY',
+                   help="extra file name rule, checked before the built-in table; may be repeated")
+    p.add_argument('--force', action='store_true', help="ignore the hash cache")
+    p.add_argument('--no-cache', action='store_true', help="do not read or write the hash cache")
+    p.set_defaults(func=cmd_import_dir, needs_index=False)
+    
+    p = commands.add_parser('hash', help="print SHA-256 digests of local files")
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--force', action='store_true', help="ignore the hash cache")
+    p.add_argument('--no-cache', action='store_true', help="do not read or write the hash cache")
+    p.set_defaults(func=cmd_hash, needs_index=False)
+    
+    p = commands.add_parser('validate', help="check index.json against meta.json")
+    p.set_defaults(func=cmd_validate, needs_index=True)
+    
+    p = commands.add_parser('verify', help="check every url/hash pair against a mirror directory or base URL")
+    p.add_argument('source', help="local mirror directory or http(s) base URL")
+    p.add_argument('-j', '--workers', type=int, default=VERIFY_WORKERS)
+    p.add_argument('-o', '--output', default='-', help="JSON report file (default: stdout)")
+    p.add_argument('--no-cache', action='store_true', help="do not use the hash cache for local files")
+    p.set_defaults(func=cmd_verify, needs_index=True)
+    
+    p = commands.add_parser('export', help="write the normalized index")
+    p.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    p.add_argument('--shards', nargs='?', const='', metavar='DIR',
+                   help="also write summary.json and <version>.json files (default DIR: next to index.json)")
+    p.add_argument('--html', nargs='?', const='', metavar='DIR',
+                   help="also prerender downloads page fragments (default DIR: html/ next to index.json)")
+    p.add_argument('--minify', action='store_true',
+                   help="also write .min.json files with precompressed .gz/.br siblings; "
+                        "saves keep them current once they exist")
+    p.set_defaults(func=cmd_export, needs_index=True)
+    
+    return parser
+
+
+def run_cli(args: argparse.Namespace) -> int:
+    store = ReleaseIndex()
+    store.path = args.index
+    meta_path = args.meta or os.path.join(os.path.dirname(os.path.abspath(args.index)), 'meta.json')
+    try:
+        # A missing index is only an error for commands that read it
+        if os.path.exists(args.index) or args.needs_index:
+            store.load(args.index)
+        if os.path.exists(meta_path):
+            store.load_meta(meta_path)
+        return args.func(store, args)
+    except (KeyError, ValueError, OSError) as e:
+        print(f"error: {e.args[0] if isinstance(e, KeyError) else e}", file=sys.stderr)
+        return 1
+
+
+def run_gui():
+    _import_tk()
     root = tk.Tk()
     app = ReleaseEditor(root)
     root.mainloop()
 
 
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    profiler = None
+    if args.profile or args.trace:
+        profiler = Profiler()
+        install_profiler(profiler)
+    try:
+        if args.command is None:
+            run_gui()
+            return 0
+        return run_cli(args)
+    finally:
+        if profiler is not None:
+            profiler.dump(args.trace or '-')
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -30,6 +30,77 @@ type ReleaseData = {
     src?: string
     zip?: string
 }
+// summary.json Structure (written next to index.json by release_editor.py, newest first)
+type ReleaseSummary = {
+    version: string
+    title: string
+    type: string
+    commit: string
+    rev: string
+}
+type SummaryIndex = {
+    // Stamp of the index.json it was built from
+    index?: string | null
+    versions: ReleaseSummary[]
+}
+// latest.json Structure (written next to index.json by release_editor.py on save)
+type LatestFile = {
+    version: string
+    url: string
+    hash: string
+}
+type LatestChannel = {
+    version: string | null
+    files: Record<string, LatestFile>
+}
+type LatestIndex = {
+    index: string | null
+    keys: string[] | null
+    // "latest" (any type), then one per release type
+    channels: Record<string, LatestChannel>
+}
+
+// html/manifest.json Structure (written by release_editor.py export --html), fragment content hashes
+// and the index.json stamp the fragments were rendered from
+type PageManifest = {
+    index?: string | null
+    list: string
+    versions: Record<string, string>
+}
+
+// SHA-256 of a response body, matching the .sha256 stamps release_editor.py writes
+async function sha256Hex(body: ArrayBuffer): Promise<string | null> {
+    if (!globalThis.crypto?.subtle) return null;
+    const digest = await crypto.subtle.digest("SHA-256", body);
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, "0")).join("");
+}
+
+// Current stamp of a JSON file, null when the file has none
+async function getStamp(jsonPath: string): Promise<string | null> {
+    try {
+        const res = await fetch(`${jsonPath}.sha256`, { cache: "no-cache" });
+        if (!res.ok) return null;
+        return (await res.text()).trim();
+    } catch {
+        return null;
+    }
+}
+
+// index.json's stamp, which files derived from it record so stale copies can be skipped
+let indexStamp: Promise<string | null> | null = null;
+let indexStampAt = 0;
+function getIndexStamp(): Promise<string | null> {
+    if (!indexStamp || Date.now() - indexStampAt >= jsonTTL) {
+        indexStamp = getStamp("/downloads/index.json");
+        indexStampAt = Date.now();
+    }
+    return indexStamp;
+}
+
+// Whether a file derived from index.json was built from its current copy
+async function isCurrent(indexRev: string | null | undefined): Promise<boolean> {
+    return !!indexRev && indexRev === await getIndexStamp();
+}
 
 // load json file
 async function getJson<T = any>(jsonPath: string): Promise<T> {
@@ -43,42 +114,185 @@ async function getJson<T = any>(jsonPath: string): Promise<T> {
     const cached = sessionStorage.getItem(cacheKey);
 
     if (cached) {
-        const { data, timestamp } = JSON.parse(cached);
+        const { data, timestamp, rev } = JSON.parse(cached);
         if (Date.now() - timestamp < jsonTTL) return data as T;
+        // Expired: a matching stamp keeps the cached copy without refetching the file
+        if (rev && (await getStamp(jsonPath)) === rev) {
+            sessionStorage.setItem(cacheKey, JSON.stringify({ data, timestamp: Date.now(), rev }));
+            return data as T;
+        }
         sessionStorage.removeItem(cacheKey);
     }
 
     const res = await fetch(jsonPath);
     if (!res.ok) throw new Error(`Failed to load JSON from ${jsonPath}`);
 
-    const data = (await res.json()) as T;
-    sessionStorage.setItem(cacheKey, JSON.stringify({ data, timestamp: Date.now() }));
+    const body = await res.arrayBuffer();
+    const data = JSON.parse(new TextDecoder().decode(body)) as T;
+    const rev = await sha256Hex(body);
+    sessionStorage.setItem(cacheKey, JSON.stringify({ data, timestamp: Date.now(), rev }));
 
     return data;
 }
 
+// Prefer the precompressed minified copy written by release_editor.py while it was built from
+// the current source (its .source file holds the source's stamp), fall back to the pretty source
+async function getMinJson<T = any>(jsonPath: string): Promise<T> {
+    const minPath = jsonPath.replace(/\.json$/, ".min.json");
+    try {
+        const [stamp, res] = await Promise.all([
+            getStamp(jsonPath),
+            fetch(`${minPath}.source`, { cache: "no-cache" }),
+        ]);
+        if (stamp && res.ok && (await res.text()).trim() === stamp) {
+            // _HEADERS serves the gzip -9 sibling with Content-Encoding: gzip, so fetch inflates it
+            if (!livePreview) {
+                try {
+                    return await getJson<T>(`${minPath}.gz`);
+                } catch {
+                    // Not deployed, or served without the encoding header
+                }
+            }
+            return await getJson<T>(minPath);
+        }
+    } catch {
+        // No minified copy
+    }
+    return getJson<T>(jsonPath);
+}
+
+// Orders versions like version_key() in release_editor.py: numeric parts compare as
+// numbers and a pre-release (1.0.0-rc1, 1.0.0rc1) sorts below its release
+function compareVersions(a: string, b: string): number {
+    const natural = (x: string, y: string) => x.localeCompare(y, undefined, { numeric: true });
+    const split = (version: string): [string[], string[] | null] => {
+        const dash = version.indexOf("-");
+        return dash < 0
+            ? [version.split("."), null]
+            : [version.slice(0, dash).split("."), version.slice(dash + 1).split(".")];
+    };
+    const [aParts, aPre] = split(a);
+    const [bParts, bPre] = split(b);
+    for (let i = 0; i < Math.min(aParts.length, bParts.length); i++) {
+        const [, aNum, aSuffix] = /^(\d*)([^]*)$/.exec(aParts[i])!;
+        const [, bNum, bSuffix] = /^(\d*)([^]*)$/.exec(bParts[i])!;
+        const diff = (aNum ? Number(aNum) : -1) - (bNum ? Number(bNum) : -1)
+            || (aSuffix ? 0 : 1) - (bSuffix ? 0 : 1)
+            || natural(aSuffix, bSuffix);
+        if (diff) return diff;
+    }
+    if (aParts.length !== bParts.length) return aParts.length - bParts.length;
+    if (aPre === null || bPre === null) return (aPre === null ? 1 : 0) - (bPre === null ? 1 : 0);
+    for (let i = 0; i < Math.min(aPre.length, bPre.length); i++) {
+        const aNumeric = /^\d+$/.test(aPre[i]);
+        const bNumeric = /^\d+$/.test(bPre[i]);
+        const diff = aNumeric && bNumeric ? Number(aPre[i]) - Number(bPre[i])
+            : aNumeric !== bNumeric ? (aNumeric ? -1 : 1)
+            : natural(aPre[i], bPre[i]);
+        if (diff) return diff;
+    }
+    return aPre.length - bPre.length;
+}
+
+// summary.json entries, or null when it is missing or was built from an older index.json
+async function getSummary(): Promise<ReleaseSummary[] | null> {
+    try {
+        const summary = await getJson<SummaryIndex>("/downloads/summary.json");
+        return (await isCurrent(summary.index)) ? summary.versions : null;
+    } catch {
+        return null;
+    }
+}
+
+// Versions newest first, from summary.json when current, else from the full index
+async function getVersions(indexPath: string): Promise<string[]> {
+    const summary = await getSummary();
+    if (summary) return summary.map(v => v.version);
+    const releases = await getMinJson<Record<string, ReleaseData>>(indexPath);
+    return Object.keys(releases)
+        .sort((a, b) => compareVersions(b, a));
+}
+
+// Newest version of a channel ("latest" or a release type), from latest.json when present
+async function getLatestVersion(channel: string, indexPath: string): Promise<string | undefined> {
+    try {
+        const latest = await getJson<LatestIndex>("/downloads/latest.json");
+        if (channel in latest.channels) return latest.channels[channel].version ?? undefined;
+    } catch {
+        // Older deployments without latest.json
+    }
+    if (channel === "latest") return (await getVersions(indexPath))[0];
+    const summary = await getSummary();
+    if (summary) return summary.find(v => v.type === channel)?.version;
+    const releases = await getMinJson<Record<string, ReleaseData>>(indexPath);
+    return Object.keys(releases)
+        .filter(v => releases[v].type === channel)
+        .sort((a, b) => compareVersions(b, a))[0];
+}
+
+// One release, from its own <version>.json when summary.json is current and lists it, else from the full index
+async function getRelease(version: string, indexPath: string): Promise<ReleaseData | undefined> {
+    const summary = await getSummary();
+    if (summary?.some(v => v.version === version)) {
+        try {
+            return await getJson<ReleaseData>(`/downloads/${encodeURIComponent(version)}.json`);
+        } catch {
+            // Fall back to the full index
+        }
+    }
+    const releases = await getMinJson<Record<string, ReleaseData>>(indexPath);
+    return releases[version] ?? (await getJson<Record<string, ReleaseData>>(indexPath))[version];
+}
+
+// Prerendered HTML for a version page, or for the version list when version is null;
+// null when missing or rendered from an older index.json
+async function getPrerendered(version: string | null): Promise<string | null> {
+    if (livePreview) return null;
+    try {
+        const manifest = await getJson<PageManifest>("/downloads/html/manifest.json");
+        if (!(await isCurrent(manifest.index))) return null;
+        const rev = version === null ? manifest.list : manifest.versions[version];
+        if (!rev) return null;
+        const name = version === null ? "versions" : encodeURIComponent(version);
+        const res = await fetch(`/downloads/html/${name}.html?rev=${rev}`);
+        return res.ok ? await res.text() : null;
+    } catch {
+        return null;
+    }
+}
+
 // Main routine of sorts
 async function loadVersion(version: string | null) {
     const indexPath = "/downloads/index.json";
     const metaPath = "/downloads/meta.json";
 
     if (!version || version === "back") {
-        const download_list = await generateVersionListMarkdown(indexPath);
-        loadMDString(download_list, "#downloads-list");
+        const prerendered = await getPrerendered(null);
+        if (prerendered !== null) {
+            listContainer!.innerHTML = prerendered;
+        } else {
+            const download_list = await generateVersionListMarkdown(indexPath);
+            loadMDString(download_list, "#downloads-list");
+        }
         document.title = "Download Phasor";
         history.pushState(null, "", location.pathname);
     } else {
-        if (version === "latest") {
-            const versions = await getJson<Record<string, ReleaseData>>(indexPath);
-            const latestVersion = Object.keys(versions)
-                .sort((a, b) => b.localeCompare(a, undefined, { numeric: true }))[0];
-            
-            if (!latestVersion) throw new Error("No latest version found");
+        // "latest", or "latest-<type>" such as latest-stable
+        if (version === "latest" || version.startsWith("latest-")) {
+            const channel = version === "latest" ? "latest" : version.slice("latest-".length);
+            const latestVersion = await getLatestVersion(channel, indexPath);
+
+            if (!latestVersion) throw new Error(`No ${version} version found`);
             version = latestVersion;
         }
 
-        const mdString = await generateReleaseMarkdown(version, indexPath, metaPath);
-        loadMDString(mdString, "#downloads-list");
+        const prerendered = await getPrerendered(version);
+        if (prerendered !== null) {
+            listContainer!.innerHTML = prerendered;
+        } else {
+            const mdString = await generateReleaseMarkdown(version, indexPath, metaPath);
+            loadMDString(mdString, "#downloads-list");
+        }
         document.title = `Download Phasor ${version}`;
         history.pushState(null, "", `${location.pathname}?version=${version}`);
     }
@@ -100,10 +314,7 @@ const params = new URLSearchParams(location.search);
 loadVersion(params.get("version"));
 
 export async function generateVersionListMarkdown(jsonPath: string): Promise<string> {
-    const releases = await getJson<Record<string, ReleaseData>>(jsonPath);
-
-    const versionLines = Object.keys(releases)
-        .sort((a, b) => b.localeCompare(a, undefined, { numeric: true }))
+    const versionLines = (await getVersions(jsonPath))
         .map(v => `- <span data-version="${v}" class="download-btn">${v}</span>`)
         .join("\n");
 
@@ -116,10 +327,9 @@ async function generateReleaseMarkdown(
     metaPath: string
 ): Promise<string> {
     // Load release data and meta mapping
-    const releases = await getJson<Record<string, ReleaseData>>(jsonPath);
-    const meta = await getJson<Record<string, { label: string; type: string }>>(metaPath);
+    const entry = await getRelease(version, jsonPath);
+    const meta = await getMinJson<Record<string, { label: string; type: string }>>(metaPath);
 
-    const entry = releases[version];
     if (!entry) throw new Error(`Version ${version} not found`);
 
     // Features list
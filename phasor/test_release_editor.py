@@ -0,0 +1,646 @@
+"""Tests for release_editor.py that need no display. Run with: python -m pytest phasor"""
+
+import gzip
+import hashlib
+import http.server
+import json
+import os
+import random
+import threading
+import urllib.parse
+
+import pytest
+
+import release_editor
+
+
+def write_index(path, versions):
+    """An index.json with one file per release, in the indent=4 layout the editor writes."""
+    data = {
+        version: {
+            'title': f"Release {version}",
+            'type': 'stable',
+            'commit': version.replace('.', '') * 4,
+            'features': [f"Feature of {version}"],
+            'files': {'linux': {'url': f"https://example.com/{version}/phasor.AppImage", 'hash': ''}},
+        }
+        for version in versions
+    }
+    path.write_text(json.dumps(data, indent=4), encoding='utf-8')
+    return path
+
+
+def test_version_key_orders_pre_releases_below_their_release():
+    versions = ['1.0.0-rc1', '1.0.9', '1.0.0', '2.0.0-rc1', '1.0.10', '1.0.0-nightly.20261018',
+                '1.0.0-rc10', '1.0.0-nightly.5', '1.0.0-rc2', '1.0.0rc1', '0.9.1', '1.0']
+    assert sorted(versions, key=release_editor.version_key, reverse=True) == [
+        '2.0.0-rc1', '1.0.10', '1.0.9', '1.0.0', '1.0.0-rc10', '1.0.0-rc2', '1.0.0-rc1',
+        '1.0.0-nightly.20261018', '1.0.0-nightly.5', '1.0.0rc1', '1.0', '0.9.1',
+    ]
+
+
+def test_sorted_versions_rows_follow_version_key():
+    versions = release_editor.SortedVersions(['1.0.9', '1.0.0-rc1', '1.0.10'])
+    assert list(versions) == ['1.0.10', '1.0.9', '1.0.0-rc1']
+    assert versions.insert('1.0.0') == 2
+    assert versions.index('1.0.0-rc1') == 3
+
+
+def test_save_refreshes_existing_shards(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0', '1.1.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    store.save_shards()
+    
+    store.new_version('2.0.0', title="Two", type='stable')
+    assert store.save()
+    
+    summary = json.loads((tmp_path / 'summary.json').read_text(encoding='utf-8'))
+    assert [entry['version'] for entry in summary['versions']] == ['2.0.0', '1.1.0', '1.0.0']
+    assert summary['index'] == release_editor.read_stamp(str(index))
+    assert (tmp_path / '2.0.0.json').exists()
+
+
+def test_save_does_not_create_shards(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    store.new_version('2.0.0')
+    assert store.save()
+    assert not (tmp_path / 'summary.json').exists()
+
+
+def test_save_refreshes_existing_minified_copy(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    report, = store.save_compact()
+    assert report['min'] < report['source']
+    
+    store.new_version('2.0.0')
+    assert store.save()
+    
+    minified = tmp_path / 'index.min.json'
+    assert set(json.loads(minified.read_text(encoding='utf-8'))) == {'1.0.0', '2.0.0'}
+    source = (tmp_path / ('index.min.json' + release_editor.SOURCE_SUFFIX)).read_text(encoding='ascii').strip()
+    assert source == release_editor.read_stamp(str(index))
+    compressed = (tmp_path / 'index.min.json.gz').read_bytes()
+    assert gzip.decompress(compressed) == minified.read_bytes()
+    # Deterministic: no name or timestamp in the header, maximum compression
+    assert compressed[3] == 0 and compressed[4:8] == b'\x00' * 4 and compressed[8] == 2
+    assert compressed == release_editor.gzip_bytes(minified.read_bytes())
+    
+    report, = store.save_compact()
+    assert report['gz'] == len(compressed)
+    assert f"gz {len(compressed):,} B" in release_editor.format_size_report(report)
+
+
+def test_import_patterns_cover_every_meta_key():
+    names = {
+        'phasor-1.0.0-setup.exe': 'win32',
+        'phasor-1.0.0-win64.zip': 'win32',
+        'phasor-1.0.0-windows-x86_64.zip': 'win32',
+        'phasor-1.0.0-arm64.msi': 'winarm',
+        'phasor-1.0.0-win-arm64.zip': 'winarm',
+        'phasor-1.0.0-avx2.exe': 'win32+',
+        'phasor_1.0.0_win_avx2.zip': 'win32+',
+        'phasor-1.0.0.pkg': 'darwin',
+        'phasor-1.0.0-darwin-x64.zip': 'darwin',
+        'phasor-1.0.0-macos.tar.gz': 'darwin',
+        'phasor-1.0.0-arm64.dmg': 'darwinarm',
+        'phasor-1.0.0-darwin-arm64.zip': 'darwinarm',
+        'phasor-vm-1.0.0-x86_64.AppImage': 'linux-vm',
+        'phasor-runtime-1.0.0-aarch64.AppImage': 'linuxarm-vm',
+        'phasor-vm-1.0.0-avx2.AppImage': 'linux+-vm',
+        'phasorc-1.0.0-x86_64.AppImage': 'linux-compiler',
+        'phasor-compiler-1.0.0-aarch64.AppImage': 'linuxarm-compiler',
+        'phasorc-1.0.0-x86_64-v3.AppImage': 'linux+-compiler',
+        'phasor-repl-1.0.0.AppImage': 'linux-repl',
+        'phasor-repl-1.0.0-arm64.AppImage': 'linuxarm-repl',
+        'phasor-repl-1.0.0-avx2.AppImage': 'linux+-repl',
+        'phasor-interp-1.0.0.AppImage': 'linux-interp',
+        'phasor-interp-1.0.0-aarch64.AppImage': 'linuxarm-interp',
+        'phasor-interp-1.0.0-avx2.AppImage': 'linux+-interp',
+        'phasor-1.0.0-freebsd-amd64.tar.gz': 'bsd',
+        'phasor-1.0.0-freebsd-aarch64.tgz': 'bsdarm',
+        'phasor-1.0.0-freebsd-avx2.tar.gz': 'bsd+',
+        'phasor-docker-1.0.0.tar.gz': 'docker',
+        'phasor-docker-1.0.0.zip': 'dockerzip',
+        'phasor-vscode-1.0.0.vsix': 'vscode',
+        'Phasor.VisualStudio-1.0.0.vsix': 'vs',
+        'phasor-1.0.0-py3-none-any.whl': 'python',
+    }
+    patterns = release_editor.compile_import_patterns()
+    assert {name: release_editor.match_artifact(name, patterns) for name in names} == names
+    
+    with open(release_editor.DEFAULT_INDEX_PATH.replace('index.json', 'meta.json'), encoding='utf-8') as f:
+        assert set(names.values()) == set(json.load(f))
+
+
+def test_import_patterns_do_not_read_darwin_as_windows():
+    patterns = release_editor.compile_import_patterns()
+    assert release_editor.match_artifact('phasor-darwin-universal.zip', patterns) == 'darwin'
+    assert release_editor.match_artifact('phasor-darwin.zip', patterns, keys={'win32', 'winarm', 'win32+'}) is None
+    assert release_editor.match_artifact('phasor-twin-engine.zip', patterns) is None
+
+
+def lazy_index(tmp_path, **extra):
+    """An indent=4 index.json with a non-ASCII feature, an escaped quote and an empty release, opened lazily."""
+    index = write_index(tmp_path / 'index.json', ['1.0.0', '1.1.0', '2.0.0'])
+    data = json.loads(index.read_text(encoding='utf-8'))
+    data['1.1.0']['features'].append('Ünïcode “names” and a \\"quoted\\" path')
+    data.update(extra)
+    index.write_text(json.dumps(data, indent=4, ensure_ascii=False), encoding='utf-8')
+    return index, data, release_editor.LazyReleases.open(str(index))
+
+
+def test_scan_index_spans_hold_each_release(tmp_path):
+    index, data, _ = lazy_index(tmp_path, **{'3.0.0': {}})
+    buf = index.read_bytes()
+    spans = release_editor.scan_index(buf)
+    assert list(spans) == ['1.0.0', '1.1.0', '2.0.0', '3.0.0']
+    assert {version: json.loads(buf[start:stop]) for version, (start, stop) in spans.items()} == data
+
+
+def test_scan_index_rejects_other_layouts():
+    data = {'1.0.0': {'title': 'One', 'features': []}}
+    pretty = json.dumps(data, indent=4).encode('utf-8')
+    assert release_editor.scan_index(pretty) is not None
+    for other in (json.dumps(data).encode('utf-8'), json.dumps(data, indent=2).encode('utf-8'),
+                  pretty.replace(b'\n', b'\r\n'), b'\xef\xbb\xbf' + pretty, b'{}', b'[]'):
+        assert release_editor.scan_index(other) is None
+
+
+def test_lazy_dumps_round_trips_byte_for_byte(tmp_path):
+    index, data, releases = lazy_index(tmp_path)
+    assert isinstance(releases, release_editor.LazyReleases)
+    assert releases.dumps(indent=4) == index.read_text(encoding='utf-8')
+    
+    # Decoding (but not editing) a version still copies its span verbatim
+    assert releases['1.1.0'].features[-1] == data['1.1.0']['features'][-1]
+    assert releases.dumps(indent=4) == index.read_text(encoding='utf-8')
+    assert releases.touched() == 1
+
+
+def test_lazy_dumps_matches_eager_dumps_after_edits(tmp_path):
+    index, data, releases = lazy_index(tmp_path)
+    eager = release_editor.releases_from_json(json.loads(index.read_text(encoding='utf-8')))
+    for mapping in (releases, eager):
+        release = mapping['2.0.0']
+        mapping['2.0.0'] = release_editor.Release.from_dict(dict(release.to_dict(), title="Edited"))
+        del mapping['1.0.0']
+        mapping['0.9.0'] = release_editor.Release.from_dict({'title': "Older", 'files': {}})
+    
+    assert releases.dumps(indent=4) == release_editor.dumps_index(eager, indent=4)
+    assert json.loads(releases.dumps()) == json.loads(release_editor.dumps_index(eager))
+    minified = releases.dumps(separators=(',', ':'))
+    assert minified == release_editor.dumps_index(eager, separators=(',', ':'))
+
+
+def journaled_store(index):
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    assert store.open_journal() == (0, None)
+    return store
+
+
+def test_journal_read_cuts_off_a_torn_last_line(tmp_path):
+    path = tmp_path / 'index.json.journal'
+    journal = release_editor.EditJournal(str(path), [1, 2])
+    journal.append({'undo': 1})
+    journal.append({'redo': 1})
+    journal.close()
+    whole = path.read_bytes()
+    path.write_bytes(whole + b'{"do":{"ops":[{"op":"set"')
+    
+    header, records = journal.read()
+    assert header == {'journal': 1, 'base': [1, 2], 'position': 0}
+    assert records == [{'undo': 1}, {'redo': 1}]
+    assert path.read_bytes() == whole
+
+
+def test_journal_replays_unsaved_edits_and_undo(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0', '1.1.0'])
+    store = journaled_store(index)
+    assert store.edit_version('1.0.0', {'title': "First"})
+    assert store.edit_version('1.1.0', {'title': "Second"})
+    store.undo()
+    store.close_journal()
+    
+    # A crash before saving: the next session replays the journal
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    # Undone edits still count as touched until the next save
+    assert store.open_journal() == (2, None)
+    assert store.data['1.0.0'].title == "First"
+    assert store.data['1.1.0'].title == "Release 1.1.0"
+    assert store.redo() is not None
+    assert store.data['1.1.0'].title == "Second"
+
+
+def test_journal_after_clean_save_ignores_outside_changes(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0'])
+    store = journaled_store(index)
+    assert store.edit_version('1.0.0', {'title': "Edited"})
+    assert store.save()
+    store.close_journal()
+    journal = tmp_path / ('index.json' + release_editor.JOURNAL_SUFFIX)
+    # Only the undo history is kept
+    assert journal.exists()
+    
+    write_index(index, ['1.0.0', '2.0.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    assert store.open_journal() == (0, None)
+    assert not journal.exists()
+
+
+def test_journal_with_unsaved_edits_is_set_aside_on_outside_changes(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0'])
+    store = journaled_store(index)
+    assert store.edit_version('1.0.0', {'title': "Edited"})
+    store.close_journal()
+    
+    write_index(index, ['1.0.0', '2.0.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    recovered, stale = store.open_journal()
+    assert recovered == 0
+    assert stale == str(index) + release_editor.JOURNAL_SUFFIX + '.stale'
+    assert store.data['1.0.0'].title == "Release 1.0.0"
+
+
+def test_save_refreshes_existing_pages(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    store.save_pages()
+    
+    store.new_version('2.0.0', title="Two", type='stable')
+    assert store.save()
+    
+    pages = tmp_path / release_editor.PAGES_DIR_NAME
+    manifest = json.loads((pages / release_editor.PAGES_MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert set(manifest['versions']) == {'1.0.0', '2.0.0'}
+    assert manifest['index'] == release_editor.read_stamp(str(index))
+    assert '2.0.0' in (pages / f"{release_editor.PAGES_LIST_NAME}.html").read_text(encoding='utf-8')
+    assert (pages / '2.0.0.html').exists()
+
+
+def rewrite_index(path, edit):
+    """Change index.json as another writer would, making sure the stat differs."""
+    stat = path.stat()
+    data = json.loads(path.read_text(encoding='utf-8'))
+    edit(data)
+    path.write_text(json.dumps(data, indent=4), encoding='utf-8')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def loaded_state(path):
+    return release_editor.disk_state(path.read_bytes(), release_editor.index_stat(str(path)))
+
+
+def outside_edit(data):
+    data['1.1.0']['title'] = "Changed outside"
+    del data['1.2.0']
+    data['1.3.0'] = dict(data['1.0.0'], title="Added outside")
+
+
+def test_check_disk_decodes_only_changed_versions(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0', '1.1.0', '1.2.0'])
+    base = loaded_state(index)
+    assert release_editor.check_disk(str(index), base) is None
+    
+    # Rewritten with the same bytes: nothing to merge, but the new stat is kept
+    os.utime(index, ns=(0, index.stat().st_mtime_ns + 1_000_000_000))
+    change = release_editor.check_disk(str(index), base)
+    assert change.releases == {} and change.state.stat != base.stat
+    
+    rewrite_index(index, outside_edit)
+    change = release_editor.check_disk(str(index), change.state)
+    assert set(change.releases) == {'1.1.0', '1.2.0', '1.3.0'}
+    assert change.releases['1.1.0'].title == "Changed outside"
+    assert change.releases['1.2.0'] is None
+    assert change.order == ['1.0.0', '1.1.0', '1.3.0']
+    assert release_editor.check_disk(str(index), change.state) is None
+
+
+def test_merge_disk_from_other_layouts(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0', '1.1.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    store.disk = loaded_state(index)
+    
+    # Minified by another tool: every version's text differs, but only real changes merge
+    data = json.loads(index.read_text(encoding='utf-8'))
+    data['1.0.0']['title'] = "Minified"
+    index.write_text(json.dumps(data, separators=(',', ':')), encoding='utf-8')
+    os.utime(index, ns=(0, store.disk.stat[1] + 1_000_000_000))
+    
+    change = release_editor.check_disk(str(index), store.disk)
+    assert change.releases['1.0.0'].title == "Minified"
+    assert store.merge_disk(change) == ({'1.0.0'}, set())
+    assert not store.dirty
+
+
+def test_merge_disk_keeps_unsaved_edits_as_conflicts(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0', '1.1.0', '1.2.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    store.disk = loaded_state(index)
+    assert store.edit_version('1.1.0', {'title': "Edited here"})
+    
+    rewrite_index(index, outside_edit)
+    change = release_editor.check_disk(str(index), store.disk)
+    merged, conflicted = store.merge_disk(change)
+    assert merged == {'1.2.0', '1.3.0'}
+    assert conflicted == {'1.1.0'}
+    assert list(store.data) == ['1.0.0', '1.1.0', '1.3.0']
+    assert store.data['1.1.0'].title == "Edited here"
+    assert store.conflicts['1.1.0'].title == "Changed outside"
+    assert store.disk == change.state
+    
+    assert store.take_disk_version('1.1.0')
+    assert store.data['1.1.0'].title == "Changed outside"
+    assert not store.conflicts
+    store.undo()
+    assert store.data['1.1.0'].title == "Edited here"
+
+
+def test_merge_disk_keep_protects_unapplied_form_edits(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0', '1.1.0', '1.2.0'])
+    store = release_editor.ReleaseIndex()
+    store.load(str(index))
+    # Saved once, so latest.json exists and a save with nothing dirty is a no-op
+    assert store.save()
+    assert not store.save()
+    store.disk = loaded_state(index)
+    
+    rewrite_index(index, outside_edit)
+    merged, conflicted = store.merge_disk(release_editor.check_disk(str(index), store.disk), keep=['1.1.0'])
+    assert conflicted == {'1.1.0'} and '1.1.0' not in merged
+    assert store.data['1.1.0'].title == "Release 1.1.0"
+    
+    # Saving writes the local release; the conflict is settled by the save
+    assert store.save()
+    saved = json.loads(index.read_text(encoding='utf-8'))
+    assert saved['1.1.0']['title'] == "Release 1.1.0"
+    assert '1.3.0' in saved and not store.conflicts
+    latest = json.loads((tmp_path / release_editor.LATEST_NAME).read_text(encoding='utf-8'))
+    assert latest['channels']['latest']['version'] == '1.3.0'
+    assert not store.save()
+
+
+def test_lazy_index_survives_in_place_rewrites(tmp_path):
+    index, data, releases = lazy_index(tmp_path)
+    original = index.read_bytes()
+    
+    # Rewritten in place by another writer, first shorter and then the same length
+    with open(index, 'w', encoding='utf-8') as f:
+        f.write('{}')
+    assert releases['1.1.0'].title == "Release 1.1.0"
+    index.write_bytes(original.replace(b'Release 1.0.0', b'Changed 1.0.0'))
+    assert releases['1.0.0'].title == "Release 1.0.0"
+    assert releases.dumps(indent=4).encode('utf-8') == original
+
+
+def test_lazy_save_indexes_what_it_wrote(tmp_path):
+    index, _, _ = lazy_index(tmp_path)
+    store = release_editor.ReleaseIndex()
+    store.load(str(index), lazy=True)
+    assert store.edit_version('1.0.0', {'title': "Edited"})
+    job = store.begin_save()
+    body = store.write_save(job)
+    store.release_snapshot()
+    
+    # Replaced by another writer before end_save() runs
+    write_index(index, ['9.0.0'])
+    store.end_save(job, body)
+    assert isinstance(store.data, release_editor.LazyReleases)
+    assert list(store.data) == ['1.0.0', '1.1.0', '2.0.0']
+    assert store.data['1.0.0'].title == "Edited"
+    assert store.data.touched() == 1
+
+
+def test_release_round_trips_the_loaded_object():
+    digest = 'ab' * 32
+    raw = {
+        'features': ["One"],
+        'title': None,
+        'custom': {'nested': [1, None]},
+        'type': 'stable',
+        'files': {
+            'linux': {'url': 'https://example.com/a', 'hash': digest},
+            'win32': {'url': 'https://example.com/b', 'hash': digest.upper()},
+            'darwin': {'url': 'https://example.com/c', 'hash': 'sha256-not-a-digest'},
+            'bsd': {'hash': '', 'url': 'https://example.com/d', 'size': 12},
+            'docker': {'url': None, 'hash': None},
+            'vs': 'https://example.com/e.vsix',
+            'python': None,
+        },
+        'commit': '',
+        'zip': None,
+    }
+    for data in (raw, dict(raw, files=None), {'title': "Only"}, {}):
+        release = release_editor.Release.from_dict(json.loads(json.dumps(data)))
+        assert json.dumps(release.to_dict()) == json.dumps(data)
+        assert json.dumps(release.copy().to_dict()) == json.dumps(data)
+    
+    release = release_editor.Release.from_dict(raw)
+    assert release.files['linux'].digest == bytes.fromhex(digest)
+    assert release.files['win32'].digest is None
+    # Removing a field drops the key rather than writing null
+    release.set('zip', None)
+    assert 'zip' not in release.to_dict()
+    release.set('zip', 'https://example.com/src.zip')
+    assert release.to_dict()['zip'] == 'https://example.com/src.zip'
+
+
+def test_new_release_writes_no_nulls():
+    release = release_editor.Release(title="New", type='beta')
+    assert release.to_dict() == {'title': "New", 'type': 'beta', 'files': {}}
+
+
+def artifact(path, body=b'artifact'):
+    path.write_bytes(body)
+    return str(path)
+
+
+def test_hash_cache_evicts_least_recently_used(tmp_path):
+    cache = release_editor.HashCache(max_entries=2)
+    a, b, c = (artifact(tmp_path / name, name.encode()) for name in ('a', 'b', 'c'))
+    cache.put(a, 'digest-a')
+    cache.put(b, 'digest-b')
+    assert cache.get(a) == 'digest-a'
+    cache.put(c, 'digest-c')
+    assert (cache.get(a), cache.get(b), cache.get(c)) == ('digest-a', None, 'digest-c')
+    # Replacing an entry does not count against the limit
+    cache.put(c, 'digest-c2')
+    assert (cache.get(a), cache.get(c)) == ('digest-a', 'digest-c2')
+
+
+def test_hash_cache_misses_when_size_mtime_or_inode_change(tmp_path):
+    cache = release_editor.HashCache(str(tmp_path / 'hashes.sqlite'))
+    path = artifact(tmp_path / 'phasor.AppImage')
+    cache.put(path, 'cached')
+    assert cache.get(path) == 'cached'
+    
+    stat = os.stat(path)
+    artifact(tmp_path / 'phasor.AppImage', b'artifact, rebuilt')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.get(path) is None
+    
+    cache.put(path, 'cached')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(path) is None
+    
+    # Same size and mtime, but a new file (e.g. replaced by a build)
+    cache.put(path, 'cached')
+    stat = os.stat(path)
+    replacement = artifact(tmp_path / 'replacement', b'artifact, rebuilt')
+    os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    keep = open(path, 'rb')  # holds the old inode so it cannot be reused
+    try:
+        os.replace(replacement, path)
+        assert cache.get(path) is None
+    finally:
+        keep.close()
+    
+    cache.put(path, 'persisted')
+    cache.close()
+    assert release_editor.HashCache(str(tmp_path / 'hashes.sqlite')).get(path) == 'persisted'
+
+
+def test_cached_sha256_force_rehashes(tmp_path):
+    cache = release_editor.HashCache()
+    path = artifact(tmp_path / 'phasor.whl')
+    real = release_editor.sha256_file(path)
+    assert release_editor.cached_sha256(path, cache) == real
+    
+    cache.put(path, 'stale')
+    assert release_editor.cached_sha256(path, cache) == 'stale'
+    assert release_editor.cached_sha256(path, cache, force=True) == real
+    assert cache.get(path) == real
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    """A local HTTP/1.1 server for tmp_path/mirror, counting the connections it accepts."""
+    root = tmp_path / 'mirror'
+    root.mkdir()
+    
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(root), **kwargs)
+        
+        def log_message(self, *args):
+            pass
+    
+    class Server(http.server.ThreadingHTTPServer):
+        connections = 0
+        
+        def get_request(self):
+            Server.connections += 1
+            return super().get_request()
+    
+    server = Server(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        yield root, f"http://127.0.0.1:{server.server_address[1]}", Server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def hosted_release(root, files):
+    """A release whose files are {key: (name, body or None when not hosted, hash)}."""
+    entries = {}
+    for key, (name, body, digest) in files.items():
+        if body is not None:
+            (root / name).write_bytes(body)
+        entries[key] = {'url': f"https://downloads.example.com/{urllib.parse.quote(name)}", 'hash': digest}
+    return release_editor.Release.from_dict({'title': "Hosted", 'files': entries})
+
+
+def test_verify_release_history_against_a_local_server(mirror):
+    root, url, server = mirror
+    sha = lambda body: hashlib.sha256(body).hexdigest()
+    good = {f'file{i}': (f"phasor {i}.AppImage", b'good %d' % i, sha(b'good %d' % i)) for i in range(4)}
+    
+    # One worker reuses one kept-alive connection for every artifact
+    report = release_editor.verify_release_history({'1.0.0': hosted_release(root, good)}, url, workers=1)
+    assert report['summary']['ok'] == 4
+    assert server.connections == 1
+    
+    mixed = {
+        'linux': ("phasor.AppImage", b'linux', sha(b'linux').upper()),
+        'win32': ("phasor#setup.exe", b'windows', sha(b'windows')),
+        'darwin': ("phasor.pkg", None, sha(b'mac')),
+        'bsd': ("phasor-bsd.tar.gz", b'rebuilt', sha(b'original')),
+        'python': ("phasor.whl", b'wheel', ''),
+    }
+    report = release_editor.verify_release_history({'1.1.0': hosted_release(root, mixed)}, url + '/', workers=2)
+    status = {entry['key']: entry['status'] for entry in report['entries']}
+    assert status == {'linux': 'ok', 'win32': 'ok', 'darwin': 'missing', 'bsd': 'mismatch', 'python': 'unverified'}
+    assert report['summary'] == {'ok': 2, 'missing': 1, 'mismatch': 1, 'error': 0, 'unverified': 1}
+
+
+def random_release(rng, keys):
+    files = {key: {'url': f"https://example.com/{rng.random()}", 'hash': f"{rng.getrandbits(256):064x}"}
+             for key in keys if rng.random() < 0.6}
+    if files and rng.random() < 0.1:
+        files[rng.choice(sorted(files))]['url'] = ''
+    return release_editor.Release.from_dict({'title': "Random", 'files': files,
+                                             'type': rng.choice(release_editor.RELEASE_TYPES + ['nightly'])})
+
+
+@pytest.mark.parametrize('keys', [['linux', 'win32', 'darwin'], None])
+def test_incremental_latest_matches_a_full_rebuild(keys):
+    rng = random.Random(4)
+    names = ['linux', 'win32', 'darwin']
+    releases = {f"1.{minor}.{patch}": random_release(rng, names) for minor in range(5) for patch in range(4)}
+    latest = release_editor.build_latest(releases, keys)
+    for _ in range(300):
+        changed = set()
+        for _ in range(rng.randint(1, 3)):
+            action = rng.random()
+            if action < 0.15 and releases:
+                version = rng.choice(sorted(releases))
+                del releases[version]
+            elif action < 0.3:
+                version = f"{rng.randint(0, 3)}.{rng.randint(0, 6)}.{rng.randint(0, 5)}"
+                releases[version] = random_release(rng, names)
+            elif releases:
+                version = rng.choice(sorted(releases))
+                release = releases[version].copy()
+                if action < 0.6:
+                    release.set('type', rng.choice(release_editor.RELEASE_TYPES + ['nightly']))
+                else:
+                    release.files = random_release(rng, names).files
+                releases[version] = release
+            else:
+                continue
+            changed.add(version)
+        incremental = release_editor.build_latest(releases, keys, None, changed, json.loads(json.dumps(latest)))
+        assert incremental == release_editor.build_latest(releases, keys)
+        latest = incremental
+
+
+def test_set_file_and_import_dir_encode_urls_alike(tmp_path):
+    index = write_index(tmp_path / 'index.json', ['1.0.0', '1.1.0'])
+    build = tmp_path / 'build'
+    build.mkdir()
+    artifact(build / 'phasor setup #1.exe')
+    base = 'https://example.com/download/v1'
+    
+    assert release_editor.main(['--index', str(index), 'set-file', '1.0.0', f"win32={build / 'phasor setup #1.exe'}",
+                                '--base-url', base + '/', '--no-cache']) == 0
+    assert release_editor.main(['--index', str(index), 'import-dir', '1.1.0', str(build),
+                                '--base-url', base, '--no-cache']) == 0
+    files = {version: release['files']['win32']
+             for version, release in json.loads(index.read_text(encoding='utf-8')).items()}
+    assert files['1.0.0'] == files['1.1.0']
+    assert files['1.0.0']['url'] == base + '/phasor%20setup%20%231.exe'